@@ -0,0 +1,88 @@
+"""Synchronous vs asyncio build over a filesystem with artificial latency.
+
+    python3 bench/bench_async.py --pages 500 --latency-ms 5
+
+SlowFS adds a fixed delay to every scandir/read/write, roughly like an NFS
+round trip. The synchronous driver pays it once per call in sequence; the
+async driver overlaps up to --concurrency calls.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from async_build import LocalFS, build_async
+from bench_parallel import same_tree
+from corpus import generate_corpus
+from template import Template
+from textnode import generate_pages_recursive, render_page
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+
+class SlowFS(LocalFS):
+    def __init__(self, latency):
+        self.latency = latency
+
+    def scandir(self, path):
+        time.sleep(self.latency)
+        return super().scandir(path)
+
+    def read_text(self, path):
+        time.sleep(self.latency)
+        return super().read_text(path)
+
+    def write_text(self, path, text):
+        time.sleep(self.latency)
+        super().write_text(path, text)
+
+
+def build_sync(fs, content, dest, basepath):
+    template = Template(fs.read_text(TEMPLATE), basepath)
+    def recurse(current_path, current_dest_path):
+        for entry, is_dir in fs.scandir(current_path):
+            if is_dir:
+                recurse(os.path.join(current_path, entry), os.path.join(current_dest_path, entry))
+            elif entry.endswith('.md'):
+                markdown = fs.read_text(os.path.join(current_path, entry))
+                fs.write_text(os.path.join(current_dest_path, entry.replace('.md', '.html')), render_page(markdown, template, basepath))
+    recurse(content, dest)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    fs = SlowFS(args.latency_ms / 1000)
+
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        generate_corpus(content, args.pages, depth=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content, TEMPLATE, os.path.join(root, "reference"), "/")
+            start = time.perf_counter()
+            build_sync(fs, content, os.path.join(root, "sync"), "/")
+            sync_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            asyncio.run(build_async(content, TEMPLATE, os.path.join(root, "async"), "/", args.concurrency, fs=fs))
+            async_seconds = time.perf_counter() - start
+        identical = same_tree(os.path.join(root, "reference"), os.path.join(root, "async"))
+
+    print(f"pages:     {args.pages}, {args.latency_ms} ms per filesystem call")
+    print(f"sync:      {sync_seconds:.2f}s")
+    print(f"async:     {async_seconds:.2f}s (concurrency {args.concurrency})")
+    print(f"speedup:   {sync_seconds / async_seconds:.1f}x")
+    print(f"identical: {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Compare the single-pass text_to_textnodes with the old chained split_nodes_* passes.
+
+    python3 bench/bench_inline.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from textnode import TextNode, TextType, split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+
+
+def chained_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+PARAGRAPHS = {
+    "link-heavy (300 links)": " ".join(f"see [page {i}](/blog/page{i}) and ![pic {i}](/images/{i}.png)" for i in range(150)),
+    "emphasis-heavy (600 spans)": " ".join(f"a **bold {i}** then _italic {i}_ then `code {i}`" for i in range(200)),
+    "plain prose": "Middle-earth was quiet for a time. " * 200,
+}
+
+
+def main():
+    for name, text in PARAGRAPHS.items():
+        assert chained_text_to_textnodes(text) == text_to_textnodes(text), name
+        number = 20
+        chained = timeit.timeit(lambda: chained_text_to_textnodes(text), number=number) / number
+        single = timeit.timeit(lambda: text_to_textnodes(text), number=number) / number
+        print(f"{name:28} chained {chained * 1000:8.2f} ms   single-pass {single * 1000:8.2f} ms   speedup {chained / single:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
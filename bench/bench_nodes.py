@@ -0,0 +1,71 @@
+"""Memory and throughput of the node classes on a large synthetic document.
+
+    python3 bench/bench_nodes.py --blocks 20000
+
+Reports tracemalloc peak and nodes/sec for markdown_to_html_node, and compares
+the slotted node classes with equivalent __dict__-backed subclasses.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import page
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType, markdown_to_html_node
+
+
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+class DictParentNode(ParentNode):
+    pass
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children or ())
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def build_nodes(text_cls, leaf_cls, parent_cls, count):
+    leaves = []
+    for i in range(count):
+        text_node = text_cls(f"word {i % 100}", TextType.TEXT)
+        leaves.append(leaf_cls(None, text_node.text))
+        leaves.append(text_node)
+    return parent_cls("div", leaves[::2]), leaves
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=20000, help="blocks in the synthetic document")
+    parser.add_argument("--nodes", type=int, default=500000, help="nodes for the slotted vs __dict__ comparison")
+    args = parser.parse_args()
+
+    markdown = page(random.Random(0), 0, args.blocks)
+    node, elapsed, peak = measure(lambda: markdown_to_html_node(markdown))
+    nodes = count_nodes(node)
+    print(f"document:  {len(markdown) / 1e6:.1f} MB markdown, {nodes} html nodes")
+    print(f"render:    {nodes / elapsed:,.0f} nodes/sec, tracemalloc peak {peak / 1e6:.1f} MB")
+    del node
+
+    for label, classes in (("slotted", (TextNode, LeafNode, ParentNode)), ("__dict__", (DictTextNode, DictLeafNode, DictParentNode))):
+        _, elapsed, peak = measure(lambda: build_nodes(*classes, args.nodes))
+        print(f"{label:9}  {args.nodes * 2 / elapsed:,.0f} nodes/sec, tracemalloc peak {peak / 1e6:.1f} MB for {args.nodes * 2} nodes")
+
+
+if __name__ == "__main__":
+    main()
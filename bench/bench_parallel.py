@@ -0,0 +1,63 @@
+"""Compare serial and parallel wall time of generate_pages_recursive.
+
+    python3 bench/bench_parallel.py --pages 10000 --jobs 0
+"""
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from corpus import generate_corpus
+from textnode import generate_pages_recursive
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "template.html")
+
+
+def timed_build(content, dest, jobs):
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            generate_pages_recursive(content, TEMPLATE, dest, "/", jobs=jobs)
+        finally:
+            sys.stdout = stdout
+    return time.perf_counter() - start
+
+def same_tree(left, right):
+    comparison = filecmp.dircmp(left, right)
+    if comparison.left_only or comparison.right_only:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(left, right, comparison.common_files, shallow=False)
+    if mismatch or errors:
+        return False
+    return all(same_tree(os.path.join(left, d), os.path.join(right, d)) for d in comparison.common_dirs)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--jobs", type=int, default=0, help="parallel worker count (0 = one per CPU core)")
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        generate_corpus(content, args.pages)
+        serial = timed_build(content, os.path.join(root, "serial"), 1)
+        parallel = timed_build(content, os.path.join(root, "parallel"), jobs)
+        identical = same_tree(os.path.join(root, "serial"), os.path.join(root, "parallel"))
+
+    print(f"pages:     {args.pages}")
+    print(f"serial:    {serial:.2f}s ({args.pages / serial:.0f} pages/s)")
+    print(f"parallel:  {parallel:.2f}s ({args.pages / parallel:.0f} pages/s, {jobs} jobs)")
+    print(f"speedup:   {serial / parallel:.2f}x")
+    print(f"identical: {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
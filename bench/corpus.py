@@ -0,0 +1,57 @@
+"""Reproducible synthetic content trees for the benchmarks.
+
+The same seed and parameters always produce byte-identical markdown, so
+timings from different runs (and different commits) are comparable.
+"""
+import os
+import random
+
+WORDS = (
+    "ring shire elf dwarf wizard river mountain forest tower king road "
+    "shadow light star song hobbit council sword horn gate bridge"
+).split()
+
+
+def sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def paragraph(rng, sentences=5, link_density=0.2):
+    parts = []
+    for _ in range(sentences):
+        text = sentence(rng)
+        roll = rng.random()
+        if roll < link_density:
+            text += f" See [the {rng.choice(WORDS)}](/blog/{rng.choice(WORDS)})."
+        elif roll < link_density + 0.1:
+            text += f" It was **{rng.choice(WORDS)}** and _{rng.choice(WORDS)}_."
+        parts.append(text)
+    return " ".join(parts)
+
+def page(rng, index, blocks=12, link_density=0.2, code_share=0.15):
+    lines = [f"# Page {index}", ""]
+    for _ in range(blocks):
+        kind = rng.random()
+        if kind < code_share:
+            lines.extend(["```", "for item in items:", "    print(item)", "```"])
+        elif kind < code_share + 0.15:
+            lines.extend(f"- {sentence(rng, 6)}" for _ in range(4))
+        elif kind < code_share + 0.25:
+            lines.append("> " + sentence(rng))
+        else:
+            lines.append(paragraph(rng, link_density=link_density))
+        lines.append("")
+    return "\n".join(lines)
+
+def page_directory(index, depth):
+    # Spread pages over `depth` levels of eight-way nested sections.
+    parts = [f"section{(index >> (3 * level)) % 8}" for level in range(depth)]
+    return os.path.join(*parts, f"page{index}") if parts else f"page{index}"
+
+def generate_corpus(root, pages, seed=0, blocks=12, link_density=0.2, depth=1, code_share=0.15):
+    """Write a reproducible content tree of `pages` markdown files under `root`."""
+    rng = random.Random(seed)
+    for index in range(pages):
+        directory = os.path.join(root, page_directory(index, depth))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "index.md"), 'w', encoding='utf-8') as f:
+            f.write(page(rng, index, blocks, link_density, code_share))
@@ -0,0 +1,121 @@
+"""Throughput benchmarks with a stored baseline and a regression gate.
+
+    python3 bench/run.py                 # measure and compare with bench/baseline.json
+    python3 bench/run.py --check         # exit 1 if any metric regressed past --threshold
+    python3 bench/run.py --update        # store the current numbers as the new baseline
+
+Baselines are machine-specific: refresh them with --update on the machine
+(or CI runner class) that runs --check.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import generate_corpus, page, paragraph
+from textnode import generate_pages_recursive, markdown_to_html_node, text_to_textnodes
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+TEMPLATE = os.path.join(BENCH_DIR, "..", "template.html")
+
+SCENARIOS = {
+    "default": dict(blocks=12, link_density=0.2, depth=1, code_share=0.15),
+    "large-pages": dict(blocks=120, link_density=0.2, depth=1, code_share=0.15),
+    "link-heavy": dict(blocks=12, link_density=0.8, depth=1, code_share=0.0),
+    "deep-tree": dict(blocks=12, link_density=0.2, depth=4, code_share=0.15),
+    "code-heavy": dict(blocks=12, link_density=0.1, depth=1, code_share=0.6),
+}
+
+
+def best_of(repeat, func):
+    # Fastest of several runs is the least noisy estimate of the code's own cost.
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def bench_scenario(params, pages, repeat):
+    rng = random.Random(1)
+    documents = [page(rng, i, params["blocks"], params["link_density"], params["code_share"]) for i in range(pages)]
+    paragraphs = [paragraph(rng, link_density=params["link_density"]) for _ in range(pages * 4)]
+    megabytes = sum(len(d.encode('utf-8')) for d in documents) / 1e6
+    inline_megabytes = sum(len(p.encode('utf-8')) for p in paragraphs) / 1e6
+    trees = [markdown_to_html_node(d) for d in documents]
+
+    results = {}
+    seconds = best_of(repeat, lambda: [markdown_to_html_node(d) for d in documents])
+    results["markdown_to_html_node"] = {"pages_per_sec": pages / seconds, "mb_per_sec": megabytes / seconds}
+    seconds = best_of(repeat, lambda: [text_to_textnodes(p) for p in paragraphs])
+    results["text_to_textnodes"] = {"mb_per_sec": inline_megabytes / seconds}
+    seconds = best_of(repeat, lambda: [t.to_html() for t in trees])
+    results["to_html"] = {"pages_per_sec": pages / seconds, "mb_per_sec": megabytes / seconds}
+
+    with tempfile.TemporaryDirectory() as root:
+        content = os.path.join(root, "content")
+        generate_corpus(content, pages, seed=2, **params)
+        def full_build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_pages_recursive(content, TEMPLATE, os.path.join(root, "docs"), "/")
+        seconds = best_of(repeat, full_build)
+    results["generate_pages_recursive"] = {"pages_per_sec": pages / seconds, "mb_per_sec": megabytes / seconds}
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for scenario, benchmarks in results.items():
+        for benchmark, metrics in benchmarks.items():
+            for metric, value in metrics.items():
+                base = baseline.get(scenario, {}).get(benchmark, {}).get(metric)
+                if base is None:
+                    status = "new"
+                else:
+                    change = value / base - 1
+                    status = f"{change:+.1%}"
+                    if change < -threshold:
+                        status += "  REGRESSION"
+                        regressions.append(f"{scenario}/{benchmark}/{metric}")
+                print(f"{scenario:<12} {benchmark:<26} {metric:<14} {value:>12.1f}  {status}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200, help="pages per scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the fastest is kept")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="limit to these scenarios")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before --check fails (default: 0.15)")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on regression")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    results = {name: bench_scenario(SCENARIOS[name], args.pages, args.repeat) for name in args.scenario or SCENARIOS}
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
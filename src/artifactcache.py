@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import time
+from atomicwrite import open_atomic
+from textnode import IMAGE_ATTRIBUTES, page_metadata
+from depgraph import page_inputs
+from blockcache import renderer_version
+from incremental import copy_asset, hash_bytes, hash_file
+
+# Subdirectories whose files are content-addressed and may be pruned at any time.
+PRUNED_DIRS = ("pages", "highlight")
+
+
+def input_digest(item):
+    if item.startswith("metadata:"):
+        return hash_bytes(json.dumps(page_metadata(item[len("metadata:"):]), sort_keys=True).encode('utf-8'))
+    if item.startswith("listing:"):
+        # Which pages a listing holds is already spelled out by their metadata inputs.
+        return ""
+    return hash_file(item)
+
+
+class ArtifactCache:
+    """Rendered pages stored under a hash of everything they were rendered from.
+
+    The key covers the renderer version (see blockcache.renderer_version), the
+    basepath, the image attributes and every input from depgraph.page_inputs, so a
+    directory restored from another run (or another machine) can only ever hand back
+    the output the current code would produce. Paths are used as given, so build
+    from the same working directory layout.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.renderer = renderer_version()
+        self.keys = {}
+        self.restored = 0
+        self.stored = 0
+
+    def page_key(self, from_path, template_path, basepath):
+        digest = hashlib.sha256()
+        images = json.dumps(IMAGE_ATTRIBUTES, sort_keys=True)
+        digest.update(f"{self.renderer}\0{basepath}\0{images}\0".encode('utf-8'))
+        for item in page_inputs(from_path, template_path):
+            digest.update(f"{item}\0{input_digest(item)}\0".encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key, suffix):
+        return os.path.join(self.directory, "pages", key[:2], key + suffix)
+
+    def restore(self, pages, template_path, basepath, link_index=None):
+        """Write every cached page to its output and return the (source, output) pairs still to render."""
+        missing = []
+        for from_path, dest_path in pages:
+            key = self.page_key(from_path, template_path, basepath)
+            self.keys[from_path] = key
+            html_path = self.entry_path(key, ".html")
+            entry = {}
+            if link_index is not None:
+                try:
+                    with open(self.entry_path(key, ".json"), 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = {}
+            if not os.path.exists(html_path) or (link_index is not None and not link_index.has_entry(entry)):
+                missing.append((from_path, dest_path))
+                continue
+            copy_asset(html_path, dest_path)
+            if link_index is not None:
+                link_index.from_entry(from_path, entry)
+            # Restoring counts as a use, so pruning by age keeps what builds still need.
+            self.touch(key)
+            self.restored += 1
+        return missing
+
+    def store(self, pages, template_path, basepath, link_index=None):
+        for from_path, dest_path in pages:
+            key = self.keys.pop(from_path, None) or self.page_key(from_path, template_path, basepath)
+            html_path = self.entry_path(key, ".html")
+            copy_asset(dest_path, html_path)
+            if link_index is not None:
+                entry = {}
+                link_index.to_entry(from_path, entry)
+                with open_atomic(self.entry_path(key, ".json")) as f:
+                    json.dump(entry, f)
+            self.touch(key)
+            self.stored += 1
+
+    def touch(self, key):
+        # The .json sidecar ages with its page, so a page in use never loses its index entry.
+        for suffix in (".html", ".json"):
+            path = self.entry_path(key, suffix)
+            if os.path.exists(path):
+                os.utime(path)
+
+    def prune(self, max_bytes=None, max_age=None):
+        """Remove files unused for more than max_age seconds, then the least recently used
+        ones until the pruned directories hold at most max_bytes. Returns how many went."""
+        files = []
+        for name in PRUNED_DIRS:
+            for root, _, names in os.walk(os.path.join(self.directory, name)):
+                for file_name in names:
+                    path = os.path.join(root, file_name)
+                    stat = os.stat(path)
+                    files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        now = time.time()
+        removed = 0
+        for mtime, size, path in files:
+            if (max_age is not None and now - mtime > max_age) or (max_bytes is not None and total > max_bytes):
+                os.remove(path)
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self):
+        return f"Artifact cache: {self.restored} restored, {self.stored} stored"
+
+    def __repr__(self):
+        return f"ArtifactCache(directory = {self.directory}, restored = {self.restored}, stored = {self.stored})"
@@ -0,0 +1,86 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from atomicwrite import write_atomic
+from template import Template
+from textnode import listings_read, note_listings_read, page_log_line, render_page
+
+
+class LocalFS:
+    """Blocking filesystem calls used by the async driver; each one runs in a worker thread."""
+
+    def scandir(self, path):
+        with os.scandir(path) as entries:
+            return sorted((entry.name, entry.is_dir()) for entry in entries)
+
+    def read_text(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def write_text(self, path, text):
+        write_atomic(path, text)
+
+
+def render_page_job(markdown, template, basepath, index_type=None, page_path=None):
+    textnodes = [] if index_type is not None else None
+    html = render_page(markdown, template, basepath, textnodes=textnodes, page_path=page_path)
+    summary = index_type.page_summary(textnodes) if index_type is not None else None
+    # Taken here, so they come back from a process pool too.
+    return html, summary, listings_read(page_path)
+
+
+async def build_async(dir_path_content, template_path, dest_dir_path, basepath, concurrency=16, fs=None, executor=None, link_index=None):
+    """Build every page with directory scans, reads, renders and writes overlapped.
+
+    At most `concurrency` filesystem operations, and `concurrency` pages, are in
+    flight at once, so memory stays bounded however large the site is. Rendering
+    runs in `executor` (the loop's default thread pool if None; pass a process
+    pool to use several cores). Output is identical to generate_pages_recursive.
+    """
+    fs = fs or LocalFS()
+    loop = asyncio.get_running_loop()
+    io_slots = asyncio.Semaphore(concurrency)
+    page_slots = asyncio.Semaphore(concurrency)
+    # A dedicated pool, so blocking I/O can really have `concurrency` calls in flight.
+    io_executor = ThreadPoolExecutor(max_workers=concurrency)
+    failures = []
+    index_type = type(link_index) if link_index is not None else None
+
+    async def io(func, *args):
+        async with io_slots:
+            return await loop.run_in_executor(io_executor, func, *args)
+
+    async def build_page(from_path, dest_path):
+        try:
+            markdown = await io(fs.read_text, from_path)
+            html, summary, listings = await loop.run_in_executor(executor, render_page_job, markdown, template, basepath, index_type, from_path)
+            await io(fs.write_text, dest_path, html)
+            if summary is not None:
+                link_index.add_summary(from_path, summary)
+            note_listings_read(from_path, listings)
+        except Exception as e:
+            print(f"  failed: {from_path}: {type(e).__name__}: {e}")
+            failures.append(from_path)
+            return
+        finally:
+            page_slots.release()
+        print(page_log_line(from_path, template_path, dest_path))
+
+    async def scan(current_path, current_dest_path, group):
+        for entry, is_dir in await io(fs.scandir, current_path):
+            full_path = os.path.join(current_path, entry)
+            if is_dir:
+                group.create_task(scan(full_path, os.path.join(current_dest_path, entry), group))
+            elif entry.endswith('.md'):
+                # The scan waits for a free slot rather than queueing a task for every page.
+                await page_slots.acquire()
+                group.create_task(build_page(full_path, os.path.join(current_dest_path, entry.replace('.md', '.html'))))
+
+    try:
+        template = Template(await io(fs.read_text, template_path), basepath)
+        async with asyncio.TaskGroup() as group:
+            group.create_task(scan(dir_path_content, dest_dir_path, group))
+    finally:
+        io_executor.shutdown()
+    if failures:
+        raise Exception(f"{len(failures)} page(s) failed to generate: {', '.join(sorted(failures))}")
@@ -0,0 +1,32 @@
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def open_atomic(path, mode='w', newline=None):
+    """Open a temporary file next to path and move it over path when the block ends.
+
+    Readers see either the old file or the whole new one, never a partial write,
+    and an output hardlinked into an earlier --atomic build is replaced rather than
+    modified in place. If the block raises, the temporary file is removed and path
+    is left as it was. Parent directories are created as needed.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Worker processes may write the same file at once (the highlight cache does).
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding, newline=newline) as f:
+            yield f
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def write_atomic(path, data):
+    """Replace path with data (bytes or str) through open_atomic."""
+    with open_atomic(path, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from atomicwrite import open_atomic
+from textnode import BLOCK_HANDLERS, TextNode, TextType
+
+BLOCK_CACHE_PATH = os.path.join(".cache", "blocks.json")
+RENDERER_FILES = ("textnode.py", "htmlnode.py", "highlight.py", "template.py")
+
+
+def renderer_version():
+    """Hash of the renderer sources (template engine included), so any parser change invalidates cached output."""
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDERER_FILES:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(f.read())
+    # Block handlers registered from other modules change the output as well.
+    for char in sorted(BLOCK_HANDLERS):
+        for handler in BLOCK_HANDLERS[char]:
+            digest.update(f"{char} {handler.block_type} {handler.render.__module__}.{handler.render.__qualname__}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class BlockCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.new_entries = []
+        self.hits = 0
+        self.misses = 0
+        # Anything besides the block text that changes its HTML (e.g. image attributes).
+        self.context = ""
+
+    @staticmethod
+    def key(block, context=""):
+        data = (context + "\0" + block if context else block).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def block_key(self, block, basepath="/"):
+        # URLs are rewritten before the HTML is cached, so each basepath has its own entries.
+        return self.key(block, self.context if basepath == "/" else f"{self.context}\0{basepath}")
+
+    def get(self, block, basepath="/"):
+        """Return (html, textnodes) for a block rendered before for basepath, or None."""
+        key = self.block_key(block, basepath)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        html, textnodes = entry
+        return html, [TextNode(text, TextType(text_type), url) for text, text_type, url in textnodes]
+
+    def put(self, block, html, textnodes=(), basepath="/"):
+        # TextNodes are kept as plain lists so entries stay JSON- and pickle-friendly.
+        key = self.block_key(block, basepath)
+        entry = [html, [[node.text, node.text_type.value, node.url] for node in textnodes]]
+        self.store(key, entry)
+        self.new_entries.append((key, entry))
+
+    def store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def drain(self):
+        """Return and forget what this cache learned since the last drain, for merging into another cache."""
+        delta = (self.new_entries, self.hits, self.misses)
+        self.new_entries = []
+        self.hits = 0
+        self.misses = 0
+        return delta
+
+    def merge(self, delta):
+        entries, hits, misses = delta
+        for key, entry in entries:
+            self.store(key, entry)
+        self.hits += hits
+        self.misses += misses
+
+    def load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if not isinstance(data, dict) or data.get("renderer") != renderer_version():
+            return self
+        for key, entry in data.get("entries", []):
+            self.store(key, entry)
+        return self
+
+    def save(self, path):
+        with open_atomic(path) as f:
+            json.dump({"renderer": renderer_version(), "entries": list(self.entries.items())}, f)
+
+    def stats(self):
+        total = self.hits + self.misses
+        ratio = self.hits / total if total else 0.0
+        return f"Block cache: {self.hits} hits, {self.misses} misses ({ratio:.0%} hit rate), {len(self.entries)} entries"
+
+    def __repr__(self):
+        return f"BlockCache(entries = {len(self.entries)}, hits = {self.hits}, misses = {self.misses})"
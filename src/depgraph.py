@@ -0,0 +1,91 @@
+import json
+import os
+from atomicwrite import open_atomic
+from textnode import collect_pages, listed_pages, listing_directories, listings_read
+
+DEPGRAPH_PATH = os.path.join(".cache", "depgraph.json")
+
+
+def metadata_input(from_path):
+    return "metadata:" + os.path.normpath(from_path)
+
+def listing_input(directory):
+    return "listing:" + os.path.normpath(directory)
+
+def page_inputs(from_path, template_path, directories=None):
+    """Everything rendering from_path reads: the source, the template and, for each
+    "{{ pages DIR }}" listing, which pages DIR holds and their metadata.
+
+    directories are the listings the page uses, as recorded by its render (see
+    textnode.listings_read); without them the source is scanned for listings.
+    """
+    inputs = [os.path.normpath(from_path), os.path.normpath(template_path)]
+    if directories is None:
+        with open(from_path, 'r', encoding='utf-8') as f:
+            directories = listing_directories(f, from_path)
+    for directory in directories:
+        inputs.append(listing_input(directory))
+        inputs.extend(metadata_input(path) for path in listed_pages(directory))
+    return inputs
+
+
+class DependencyGraph:
+    """Output file (relative to the output root) -> the inputs it was rendered from."""
+
+    def __init__(self):
+        self.outputs = {}
+
+    def record(self, output, inputs):
+        self.outputs[output] = sorted(set(inputs))
+
+    def forget(self, output):
+        self.outputs.pop(output, None)
+
+    def dependents(self, changed_inputs):
+        changed_inputs = set(changed_inputs)
+        return sorted(output for output, inputs in self.outputs.items() if not changed_inputs.isdisjoint(inputs))
+
+    def explain(self, path):
+        path = os.path.normpath(path)
+        lines = []
+        if path in self.outputs:
+            lines.append(f"{path} was rendered from:")
+            for item in self.outputs[path]:
+                kind, _, target = item.partition(":") if ":" in item else ("file", "", item)
+                lines.append(f"  {kind:<9}{target}")
+        readers = self.dependents([path, metadata_input(path), listing_input(path)])
+        if readers:
+            lines.append(f"Outputs that read {path}:")
+            lines.extend(f"  {output}" for output in readers)
+        if not lines:
+            lines.append(f"{path} is not in the dependency graph")
+        return "\n".join(lines)
+
+    def load(self, path=DEPGRAPH_PATH):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                outputs = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(outputs, dict):
+            self.outputs = outputs
+        return self
+
+    def save(self, path=DEPGRAPH_PATH):
+        with open_atomic(path) as f:
+            json.dump(self.outputs, f, indent=1, sort_keys=True)
+
+    def __repr__(self):
+        return f"DependencyGraph(outputs = {len(self.outputs)})"
+
+
+def record_build(graph, dir_path_content, template_path, dest_dir_path):
+    """Record every page of a full build, replacing whatever the graph held before.
+
+    Pages rendered by the build are recorded from what their render read; only the
+    others (such as pages restored from the artifact cache) are read again.
+    """
+    graph.outputs = {}
+    for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+        graph.record(os.path.relpath(dest_path, dest_dir_path), page_inputs(from_path, template_path, listings_read(from_path)))
+    return graph
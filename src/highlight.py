@@ -0,0 +1,113 @@
+import hashlib
+import html
+import os
+import re
+from atomicwrite import open_atomic
+
+def source_version():
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+# Part of every cache key, so any change to the lexers or the markup re-highlights cached
+# snippets, just as it invalidates the block and artifact caches (see blockcache.renderer_version).
+HIGHLIGHTER_VERSION = source_version()
+
+# Where highlighted snippets are kept between builds; None keeps nothing.
+CACHE_DIR = None
+
+STRING = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+NUMBER = r"\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+def words(names):
+    return r"\b(?:" + "|".join(names.split()) + r")\b"
+
+# Per language: (token class, pattern) pairs, tried left to right at each position.
+LEXERS = {
+    "python": [
+        ("comment", r"#[^\n]*"),
+        ("string", r"(?:[rRbBuUfF]{1,2})?(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|" + STRING + ")"),
+        ("keyword", words("False None True and as assert async await break class continue def del elif else except finally "
+                          "for from global if import in is lambda nonlocal not or pass raise return try while with yield")),
+        ("builtin", words("print len range enumerate zip open dict list set tuple str int float bool isinstance super type self")),
+        ("number", NUMBER),
+    ],
+    "javascript": [
+        ("comment", r"//[^\n]*|/\*[\s\S]*?\*/"),
+        ("string", r"`(?:\\.|[^`\\])*`|" + STRING),
+        ("keyword", words("async await break case catch class const continue default delete do else export extends false "
+                          "finally for function if import in instanceof let new null return switch this throw true try "
+                          "typeof undefined var void while yield")),
+        ("number", NUMBER),
+    ],
+    "bash": [
+        ("comment", r"(?<![^\s])#[^\n]*"),
+        ("string", STRING),
+        ("variable", r"\$\{[^}\n]*\}|\$\w+"),
+        ("keyword", words("if then else elif fi for while until do done case esac in function return export local")),
+        ("number", NUMBER),
+    ],
+    "css": [
+        ("comment", r"/\*[\s\S]*?\*/"),
+        ("string", STRING),
+        ("property", r"[\w-]+(?=\s*:[^:])"),
+        ("number", r"#[\da-fA-F]{3,8}\b|-?\b\d*\.?\d+(?:px|em|rem|%|vh|vw|s|ms|deg)?"),
+    ],
+    "json": [
+        ("property", r'"(?:\\.|[^"\\\n])*"(?=\s*:)'),
+        ("string", r'"(?:\\.|[^"\\\n])*"'),
+        ("keyword", words("true false null")),
+        ("number", r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b"),
+    ],
+}
+ALIASES = {"py": "python", "python3": "python", "js": "javascript", "sh": "bash", "shell": "bash", "console": "bash"}
+
+PATTERNS = {
+    language: re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in rules))
+    for language, rules in LEXERS.items()
+}
+
+
+def tokenize(code, language):
+    """Yield (token class or None, text) pieces covering the whole of code."""
+    pattern = PATTERNS.get(ALIASES.get(language, language))
+    if pattern is None:
+        yield None, code
+        return
+    position = 0
+    for match in pattern.finditer(code):
+        if match.start() > position:
+            yield None, code[position:match.start()]
+        yield match.lastgroup, match.group()
+        position = match.end()
+    if position < len(code):
+        yield None, code[position:]
+
+def highlight_uncached(code, language):
+    parts = []
+    for token_class, text in tokenize(code, language):
+        text = html.escape(text, quote=False)
+        parts.append(f'<span class="hl-{token_class}">{text}</span>' if token_class else text)
+    return "".join(parts)
+
+def cache_path(code, language):
+    key = hashlib.blake2b(f"{HIGHLIGHTER_VERSION}\0{language}\0{code}".encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], key + ".html")
+
+def highlight(code, language):
+    """Escaped HTML for code with <span class="hl-..."> around tokens (plain escaped text for unknown languages).
+
+    With CACHE_DIR set, each (language, code) result is stored in its own file, so
+    parallel build workers share the cache without coordinating.
+    """
+    if CACHE_DIR is None:
+        return highlight_uncached(code, language)
+    path = cache_path(code, language)
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except OSError:
+        pass
+    result = highlight_uncached(code, language)
+    with open_atomic(path, newline='') as f:
+        f.write(result)
+    return result
@@ -1,4 +1,9 @@
+import io
+
 class HTMLNode:
+    # Pages produce huge numbers of nodes, so no per-instance __dict__.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -6,6 +11,11 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        buffer = io.StringIO()
+        self.render_to(buffer)
+        return buffer.getvalue()
+
+    def render_to(self, stream):
         raise NotImplementedError("it will be later")
     
     def props_to_html(self):
@@ -19,32 +29,65 @@ class HTMLNode:
         return f"HTMLNode: tag = {self.tag}, value = {self.value}, children = {self.children}, props = {self.props}"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def render_to(self, stream):
         if self.value is None:
             raise ValueError("LeafNode must have a non-empty value")
         if self.tag is None:
-            return self.value
-        if not self.props:
-            return f'<{self.tag}>{self.value}</{self.tag}>'
+            stream.write(self.value)
+        elif not self.props:
+            stream.write(f'<{self.tag}>{self.value}</{self.tag}>')
         else:
-            attrs = ' '.join(f'{key}="{value}"' for key, value in self.props.items())
-            return f'<{self.tag} {attrs}>{self.value}</{self.tag}>'
+            stream.write(f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>')
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def render_to(self, stream):
         if not self.tag:
             raise ValueError("ParentNode must have a non-empty tag")
         if not self.children:
             raise ValueError("ParentNode must have a non-empty children")
-        else:
-            att = ''
-            for child in self.children:
-                att += child.to_html()
-            return f'<{self.tag}>{att}</{self.tag}>'
\ No newline at end of file
+        # Children write straight into the stream; no intermediate strings are built per level.
+        stream.write(f'<{self.tag}>')
+        for child in self.children:
+            child.render_to(stream)
+        stream.write(f'</{self.tag}>')
+
+
+# Attributes holding a URL (srcset holds a comma-separated list of "url width" candidates).
+URL_ATTRIBUTES = ("href", "src")
+
+def rewrite_url(url, basepath):
+    return basepath + url[1:] if url.startswith("/") else url
+
+def rewrite_props(props, basepath):
+    rewritten = {}
+    for key, value in props.items():
+        if key in URL_ATTRIBUTES:
+            value = rewrite_url(value, basepath)
+        elif key == "srcset":
+            value = ", ".join(rewrite_url(candidate, basepath) for candidate in value.split(", "))
+        rewritten[key] = value
+    return rewritten
+
+def rewrite_urls(node, basepath):
+    """Copy of the node tree with root-relative href, src and srcset URLs moved under basepath.
+
+    Text and raw HTML leaves are left alone, so a code sample that shows href="/..."
+    is published as written.
+    """
+    if basepath == "/":
+        return node
+    props = rewrite_props(node.props, basepath) if node.props else node.props
+    if isinstance(node, ParentNode):
+        return ParentNode(node.tag, [rewrite_urls(child, basepath) for child in node.children], props)
+    return LeafNode(node.tag, node.value, props)
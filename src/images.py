@@ -0,0 +1,167 @@
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from atomicwrite import open_atomic
+from incremental import copy_asset, hash_file
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+IMAGE_CACHE_DIR = os.path.join(".cache", "images")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif")
+VARIANT_WIDTHS = (480, 960, 1440)
+
+
+def image_size(path):
+    """(width, height) read from the file header, or None for formats we can't read."""
+    with open(path, 'rb') as f:
+        head = f.read(26)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head.startswith(b"\xff\xd8"):
+            f.seek(2)
+            return jpeg_size(f)
+    return None
+
+def jpeg_size(f):
+    # Walk the segments up to the first start-of-frame marker, which holds the size.
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+def variant_format():
+    """Format of the resized variants, or None when Pillow (or its WebP support) is missing."""
+    if Image is None or not features.check("webp"):
+        return None
+    return "webp"
+
+def variant_name(source_hash, width, image_format):
+    return f"{source_hash[:16]}-{width}w.{image_format}"
+
+def process_image(job):
+    """Read the size of one image and write its smaller variants into the cache directory."""
+    source_path, source_hash, cache_dir, image_format = job
+    size = image_size(source_path)
+    entry = {"size": list(size) if size else None, "variants": []}
+    if size is None or image_format is None:
+        return entry
+    width, height = size
+    with Image.open(source_path) as image:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for variant_width in VARIANT_WIDTHS:
+            if variant_width >= width:
+                break
+            name = variant_name(source_hash, variant_width, image_format)
+            path = os.path.join(cache_dir, name)
+            tmp_path = path + ".tmp"
+            resized = image.resize((variant_width, max(1, round(height * variant_width / width))), Image.LANCZOS)
+            resized.save(tmp_path, image_format.upper(), quality=80, method=4)
+            os.replace(tmp_path, path)
+            entry["variants"].append([variant_width, name])
+    return entry
+
+def load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "index.json"), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index if isinstance(index, dict) else {}
+
+def save_index(index, cache_dir):
+    with open_atomic(os.path.join(cache_dir, "index.json")) as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+
+def image_attributes(url, entry, variant_urls):
+    attributes = {}
+    if entry["size"]:
+        width, height = entry["size"]
+        attributes["width"] = str(width)
+        attributes["height"] = str(height)
+        if variant_urls:
+            candidates = [f"{variant_url} {variant_width}w" for variant_width, variant_url in variant_urls]
+            candidates.append(f"{url} {width}w")
+            attributes["srcset"] = ", ".join(candidates)
+    attributes["loading"] = "lazy"
+    attributes["decoding"] = "async"
+    return attributes
+
+def build_images(static_dir, dest_dir, cache_dir=IMAGE_CACHE_DIR, jobs=1):
+    """Size every image under static_dir, publish its resized variants next to it in
+    dest_dir and return the extra <img> attributes for each image URL.
+
+    Variants are cached by source hash in cache_dir, so an unchanged image is never
+    decoded again. URLs are root-relative; the basepath is applied to srcset along
+    with href and src when the page's node tree is rendered.
+    """
+    image_format = variant_format()
+    index = load_index(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    images = []
+    jobs_to_run = []
+    for root, _, names in os.walk(static_dir):
+        for name in sorted(names):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            source_path = os.path.join(root, name)
+            source_hash = hash_file(source_path)
+            images.append((source_path, source_hash))
+            cached = index.get(source_hash)
+            if (cached is None or cached.get("format") != image_format or
+                    not all(os.path.exists(os.path.join(cache_dir, variant)) for _, variant in cached["variants"])):
+                jobs_to_run.append((source_path, source_hash, cache_dir, image_format))
+
+    if jobs is not None and jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs is None or jobs == 1 or len(jobs_to_run) < 2:
+        results = [process_image(job) for job in jobs_to_run]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(process_image, jobs_to_run))
+    for (_, source_hash, _, _), entry in zip(jobs_to_run, results):
+        entry["format"] = image_format
+        index[source_hash] = entry
+
+    attributes = {}
+    live = set()
+    for source_path, source_hash in images:
+        entry = index[source_hash]
+        relative = os.path.relpath(source_path, static_dir)
+        stem = os.path.splitext(relative)[0]
+        variant_urls = []
+        for variant_width, variant in entry["variants"]:
+            variant_relative = f"{stem}-{variant_width}w.{image_format}"
+            copy_asset(os.path.join(cache_dir, variant), os.path.join(dest_dir, variant_relative), link=True)
+            variant_urls.append((variant_width, "/" + variant_relative.replace(os.sep, "/")))
+            live.add(variant)
+        url = "/" + relative.replace(os.sep, "/")
+        attributes[url] = image_attributes(url, entry, variant_urls)
+
+    # Drop cache entries (and their files) for images that no longer exist.
+    live_hashes = {source_hash for _, source_hash in images}
+    for source_hash in list(index):
+        if source_hash not in live_hashes:
+            del index[source_hash]
+    for name in os.listdir(cache_dir):
+        if name != "index.json" and name not in live:
+            os.remove(os.path.join(cache_dir, name))
+    save_index(index, cache_dir)
+    print(f"Images: {len(jobs_to_run)} processed, {len(images) - len(jobs_to_run)} cached, {len(live)} variant(s)")
+    return attributes
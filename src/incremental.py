@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import shutil
+from atomicwrite import open_atomic
+from textnode import IMAGE_ATTRIBUTES, LinkIndex, collect_pages, generate_pages, listing_dir, listings_read, page_metadata
+from depgraph import DEPGRAPH_PATH, DependencyGraph, listing_input, metadata_input, page_inputs
+from blockcache import renderer_version
+
+MANIFEST_PATH = os.path.join(".cache", "manifest.json")
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict):
+        return {}
+    return manifest
+
+def save_manifest(manifest, manifest_path):
+    with open_atomic(manifest_path) as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+def remove_output(dest_path, dest_dir_path):
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    # Drop directories left empty by the removal, but never the output root itself.
+    root = os.path.abspath(dest_dir_path)
+    directory = os.path.dirname(os.path.abspath(dest_path))
+    while directory != root and directory.startswith(root + os.sep):
+        if os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+def invalidate_manifest(manifest_path=MANIFEST_PATH):
+    """Forget the recorded pages and static files, for builds that rewrite the output
+    without going through the manifest; the next incremental build starts over."""
+    manifest = load_manifest(manifest_path)
+    if not any(key in manifest for key in ("pages", "basepath", "static")):
+        return
+    for key in ("pages", "basepath", "static"):
+        manifest.pop(key, None)
+    save_manifest(manifest, manifest_path)
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath, manifest_path=MANIFEST_PATH, jobs=1, cache=None, link_index=None, graph_path=DEPGRAPH_PATH, artifacts=None):
+    manifest = load_manifest(manifest_path)
+    graph = DependencyGraph().load(graph_path)
+    template_hash = hash_file(template_path)
+    basepath_hash = hash_bytes(basepath.encode('utf-8'))
+    images_hash = hash_bytes(json.dumps(IMAGE_ATTRIBUTES, sort_keys=True).encode('utf-8'))
+    # A parser fix changes every page, even those whose markdown did not change.
+    renderer = renderer_version()
+    old_pages = manifest.get("pages", {})
+    full_rebuild = (
+        manifest.get("template") != template_hash or
+        manifest.get("basepath") != basepath_hash or
+        manifest.get("images") != images_hash or
+        manifest.get("renderer") != renderer
+    )
+
+    # Outputs are recorded relative to the output root, so a build into a fresh
+    # (or hardlink-cloned) directory reuses the manifest; missing files are re-rendered.
+    all_pages = collect_pages(dir_path_content, dest_dir_path)
+    pages = {}
+    changed_inputs = set()
+    for from_path, dest_path in all_pages:
+        source_hash = hash_file(from_path)
+        previous = old_pages.get(from_path)
+        if previous is None:
+            changed_inputs.add(listing_input(listing_dir(from_path)))
+        # Metadata is cached here, so an unchanged page is never opened to read it.
+        if previous is not None and previous.get("hash") == source_hash and "metadata" in previous:
+            metadata = previous["metadata"]
+        else:
+            changed_inputs.add(os.path.normpath(from_path))
+            metadata = page_metadata(from_path)
+            if previous is None or previous.get("metadata") != metadata:
+                changed_inputs.add(metadata_input(from_path))
+        pages[from_path] = {"hash": source_hash, "metadata": metadata, "dest": os.path.relpath(dest_path, dest_dir_path)}
+    for from_path in old_pages:
+        if from_path not in pages:
+            changed_inputs.add(metadata_input(from_path))
+            changed_inputs.add(listing_input(listing_dir(from_path)))
+
+    # Pages that list a changed page (its title, or a page added or removed
+    # next to it) are re-rendered along with the changed page itself.
+    dependents = set(graph.dependents(changed_inputs))
+    # Links are always collected, so the manifest can answer for pages that are not re-rendered.
+    if link_index is None:
+        link_index = LinkIndex()
+    stale = []
+    for from_path, dest_path in all_pages:
+        entry = pages[from_path]
+        previous = old_pages.get(from_path)
+        unchanged = (
+            not full_rebuild and
+            previous is not None and
+            previous.get("hash") == entry["hash"] and
+            previous.get("dest") == entry["dest"] and
+            link_index.has_entry(previous) and
+            entry["dest"] in graph.outputs and
+            entry["dest"] not in dependents and
+            os.path.exists(dest_path)
+        )
+        if not unchanged:
+            stale.append((from_path, dest_path))
+    generate_pages(stale, template_path, basepath, jobs, cache, link_index, artifacts)
+    rendered = len(stale)
+    for from_path, dest_path in stale:
+        graph.record(pages[from_path]["dest"], page_inputs(from_path, template_path, listings_read(from_path)))
+    for from_path, entry in pages.items():
+        if from_path in link_index.pages:
+            link_index.to_entry(from_path, entry)
+        else:
+            link_index.from_entry(from_path, old_pages[from_path])
+            link_index.to_entry(from_path, entry)
+
+    removed = 0
+    live_dests = {page["dest"] for page in pages.values()}
+    for from_path, entry in old_pages.items():
+        if from_path not in pages and entry.get("dest") not in live_dests:
+            remove_output(os.path.join(dest_dir_path, entry["dest"]), dest_dir_path)
+            removed += 1
+    for output in list(graph.outputs):
+        if output not in live_dests:
+            graph.forget(output)
+
+    manifest["template"] = template_hash
+    manifest["basepath"] = basepath_hash
+    manifest["images"] = images_hash
+    manifest["renderer"] = renderer
+    manifest["pages"] = pages
+    save_manifest(manifest, manifest_path)
+    graph.save(graph_path)
+    print(f"Incremental build: {rendered} rendered, {len(pages) - rendered} unchanged, {removed} removed")
+    return rendered, removed
+
+def copy_file_fast(source_path, dest_path):
+    # copy_file_range lets the kernel (or a reflink-capable filesystem) move the bytes.
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return
+        except OSError:
+            pass
+    shutil.copyfile(source_path, dest_path)
+
+def copy_asset(source_path, dest_path, link=False):
+    # Publish through a temporary name so readers never see a half-written file,
+    # and so an existing hardlinked destination is replaced rather than truncated.
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    linked = False
+    if link:
+        try:
+            os.link(source_path, tmp_path)
+            linked = True
+        except OSError:
+            pass
+    if not linked:
+        copy_file_fast(source_path, tmp_path)
+        shutil.copystat(source_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+def sync_static(source_dir, destination_dir, manifest_path=MANIFEST_PATH, checksum=False, link=False):
+    manifest = load_manifest(manifest_path)
+    old_assets = manifest.get("static", {})
+    assets = {}
+    copied = 0
+    for root, _, names in os.walk(source_dir):
+        for name in sorted(names):
+            source_path = os.path.join(root, name)
+            relative = os.path.relpath(source_path, source_dir)
+            dest_path = os.path.join(destination_dir, relative)
+            stat = os.stat(source_path)
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            if checksum:
+                entry["hash"] = hash_file(source_path)
+            # The source is compared with what the manifest recorded when it was last copied,
+            # not with the output, which later stages (e.g. --minify) may have rewritten.
+            previous = old_assets.get(relative, {})
+            if checksum:
+                unchanged = previous.get("hash") == entry["hash"]
+            else:
+                unchanged = previous.get("size") == entry["size"] and previous.get("mtime_ns") == entry["mtime_ns"]
+            unchanged = unchanged and os.path.exists(dest_path)
+            if not unchanged:
+                copy_asset(source_path, dest_path, link)
+                copied += 1
+            assets[relative] = entry
+
+    removed = 0
+    for relative in old_assets:
+        if relative not in assets:
+            remove_output(os.path.join(destination_dir, relative), destination_dir)
+            removed += 1
+
+    manifest = load_manifest(manifest_path)
+    manifest["static"] = assets
+    save_manifest(manifest, manifest_path)
+    print(f"Static sync: {copied} copied, {len(assets) - copied} unchanged, {removed} removed")
+    return copied, removed
@@ -0,0 +1,61 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+
+def output_paths(dest_dir_path):
+    """Every file under the output root (pages and copied static files), as site-relative URL paths."""
+    paths = set()
+    for root, _, names in os.walk(dest_dir_path):
+        for name in names:
+            relative = os.path.relpath(os.path.join(root, name), dest_dir_path)
+            paths.add(relative.replace(os.sep, "/"))
+    return paths
+
+def is_internal(url):
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc and bool(parts.path)
+
+def resolve(url, page_output):
+    """Site-relative path that url points to from the page at page_output, or None if external."""
+    if not is_internal(url):
+        return None
+    path = unquote(urlsplit(url).path)
+    if path.startswith("/"):
+        # The basepath rewrite publishes "/x" as basepath + "x", which is served from
+        # the output root, so "/x" resolves to "x". A link that already spells out the
+        # basepath gets it twice and is reported as broken.
+        path = path[1:]
+    else:
+        path = posixpath.join(posixpath.dirname(page_output), path)
+    path = posixpath.normpath(path)
+    return "" if path == "." else path
+
+def target_exists(path, paths):
+    if path.startswith("../"):
+        return False
+    if path == "" or path.endswith("/"):
+        return posixpath.join(path, "index.html") in paths
+    return path in paths or posixpath.join(path, "index.html") in paths or path + ".html" in paths
+
+def check_links(link_index, pages, dest_dir_path):
+    """Return (source, text_type, url) for every internal link or image whose target is not in the output.
+
+    pages is the (source, output) list the build rendered; the index holds the
+    links the parser found, so no generated HTML is read back.
+    """
+    paths = output_paths(dest_dir_path)
+    page_outputs = {from_path: os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/") for from_path, dest_path in pages}
+    broken = []
+    for from_path, text_type, url, _ in link_index.links():
+        if from_path not in page_outputs:
+            continue
+        path = resolve(url, page_outputs[from_path])
+        if path is not None and not target_exists(path, paths):
+            broken.append((from_path, text_type, url))
+    return broken
+
+def report(broken):
+    lines = [f"Broken {text_type} in {from_path}: {url}" for from_path, text_type, url in broken]
+    lines.append(f"Link check: {len(broken)} broken link(s)")
+    return "\n".join(lines)
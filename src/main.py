@@ -1,15 +1,221 @@
-from textnode import TextType, TextNode, copy_static, generate_page, generate_pages_recursive
+from textnode import TextType, TextNode, IMAGE_ATTRIBUTES, LinkIndex, _init_worker, collect_page_variants, collect_pages, copy_static, generate_page, generate_page_variants, generate_pages_recursive, set_image_attributes
+from incremental import MANIFEST_PATH, generate_pages_incremental, hash_bytes, invalidate_manifest, sync_static
+from publish import materialize, rollback, staged_build
+from depgraph import DEPGRAPH_PATH, DependencyGraph, record_build
+from linkcheck import check_links, report
+from images import IMAGE_CACHE_DIR, build_images
+from minify import optimize_output
+from siteindex import SiteIndex, write_site_files
+import highlight
+from blockcache import BLOCK_CACHE_PATH, BlockCache
+from artifactcache import ArtifactCache
+from profiler import PROFILE_PATH, Profiler
+from async_build import build_async
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
+import asyncio
+import cProfile
 import sys
 
-if len(sys.argv) > 1:
-    basepath = sys.argv[1]
-else:
-    basepath = "/"
+LINK_INDEX_PATH = os.path.join(".cache", "links.json")
+HIGHLIGHT_CACHE_DIR = os.path.join(".cache", "highlight")
 
-def main():
-    copy_static("static", "docs")
-    generate_pages_recursive("content", "template.html", "docs", basepath)
+def parse_variant(text):
+    basepath, separator, dest_dir = text.partition(":")
+    if not separator or not basepath.startswith("/") or not basepath.endswith("/") or not dest_dir:
+        raise argparse.ArgumentTypeError(f"expected BASEPATH:OUTDIR with BASEPATH like /path/, got {text!r}")
+    return basepath, dest_dir
+
+def variant_manifest_path(dest_dir):
+    return os.path.join(".cache", f"manifest-{hash_bytes(os.path.abspath(dest_dir).encode('utf-8'))[:12]}.json")
+
+def cache_path(args, default):
+    # --cache-dir moves everything that is otherwise kept in .cache/ into that directory.
+    return os.path.join(args.cache_dir, os.path.relpath(default, ".cache")) if args.cache_dir else default
+
+def build_state(args):
+    # Files that describe what is in docs/, kept in step with it by --atomic and --rollback.
+    return (cache_path(args, MANIFEST_PATH), cache_path(args, DEPGRAPH_PATH))
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under (default: /)")
+    parser.add_argument("--incremental", action="store_true", help="only re-render pages whose inputs changed since the last build")
+    parser.add_argument("--checksum", action="store_true", help="with --incremental, also compare static files by content hash")
+    parser.add_argument("--link-static", action="store_true", help="with --incremental, hardlink static files into docs/ instead of copying")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render pages in N worker processes (0 = one per CPU core)")
+    parser.add_argument("--async-io", action="store_true", help="overlap directory scans, reads, renders and writes (for slow or network filesystems)")
+    parser.add_argument("--concurrency", type=int, default=16, help="with --async-io, maximum filesystem operations and pages in flight (default: 16)")
+    parser.add_argument("--images", action="store_true", help="add width/height, lazy loading and resized srcset variants (needs Pillow) to images in static/")
+    parser.add_argument("--minify", action="store_true", help="minify generated HTML and CSS (pre/code content is kept as is)")
+    parser.add_argument("--precompress", action="store_true", help="write .gz (and .br, with the brotli module) next to text outputs")
+    parser.add_argument("--site-url", metavar="URL", help="write sitemap.xml, feed.xml and search.json for the site published at URL")
+    parser.add_argument("--feed-author", metavar="NAME", help="with --site-url, the feed's author (default: the home page's author front matter, else its title)")
+    parser.add_argument("--feed-section", default="blog", help="with --site-url, the content/ directory whose pages go in the feed (default: blog)")
+    parser.add_argument("--link-index", action="store_true", help="write every page's links and images to .cache/links.json")
+    parser.add_argument("--check-links", action="store_true", help="fail the build if a link or image points at a file that is not in the output")
+    parser.add_argument("--block-cache", action="store_true", help="reuse rendered HTML of identical markdown blocks, persisted in .cache/blocks.json")
+    parser.add_argument("--block-cache-size", type=int, default=10000, help="maximum number of cached blocks (default: 10000)")
+    parser.add_argument("--profile", action="store_true", help="record per-stage timings for every page into .cache/profile.json (renders serially)")
+    parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages listed by --profile (default: 10)")
+    parser.add_argument("--cprofile", metavar="FILE", help="also write cProfile stats (pstats format) to FILE")
+    parser.add_argument("--atomic", action="store_true", help="build into .builds/ and publish by atomically re-pointing the docs symlink")
+    parser.add_argument("--keep", type=int, default=2, help="with --atomic, number of previous builds kept for rollback (default: 2)")
+    parser.add_argument("--rollback", action="store_true", help="point docs back at the previous atomic build and exit")
+    parser.add_argument("--explain", metavar="PATH", help="show what an output (or source) was rendered from and which outputs read it, then exit")
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="keep build state in DIR instead of .cache/, plus rendered pages keyed by their inputs, so DIR can be saved and restored between CI runs")
+    parser.add_argument("--cache-max-size", type=int, metavar="MB", help="with --cache-dir, prune the least recently used entries beyond MB megabytes")
+    parser.add_argument("--cache-max-age", type=float, metavar="DAYS", help="with --cache-dir, prune entries not used for DAYS days")
+    parser.add_argument("--variant", metavar="BASEPATH:OUTDIR", type=parse_variant, action="append",
+                        help="build the site for BASEPATH into OUTDIR instead of docs/; repeat to publish several variants from one parse")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.async_io:
+        unsupported = [flag for flag, value in (("--incremental", args.incremental), ("--block-cache", args.block_cache), ("--cache-dir", args.cache_dir),
+                                                # Pages render concurrently, which per-page stage timings can't follow.
+                                                ("--profile", args.profile)) if value]
+        if unsupported:
+            parser.error(f"--async-io can't be combined with {', '.join(unsupported)}")
+    if args.variant:
+        unsupported = [flag for flag, value in (("--incremental", args.incremental), ("--async-io", args.async_io), ("--cache-dir", args.cache_dir),
+                                                ("--atomic", args.atomic), ("--rollback", args.rollback), ("--site-url", args.site_url),
+                                                ("--link-index", args.link_index), ("--check-links", args.check_links)) if value]
+        if unsupported:
+            parser.error(f"--variant can't be combined with {', '.join(unsupported)}")
+    return args
+
+def build(args, dest_dir):
+    highlight.CACHE_DIR = cache_path(args, HIGHLIGHT_CACHE_DIR)
+    cache = BlockCache(args.block_cache_size).load(cache_path(args, BLOCK_CACHE_PATH)) if args.block_cache else None
+    artifacts = ArtifactCache(args.cache_dir) if args.cache_dir else None
+    if args.site_url:
+        link_index = SiteIndex()
+    else:
+        link_index = LinkIndex() if args.link_index or args.check_links else None
+    if args.incremental:
+        # Hashes, unlike mtimes, survive a fresh checkout, so a restored --cache-dir always compares by content.
+        sync_static("static", dest_dir, cache_path(args, MANIFEST_PATH), checksum=args.checksum or bool(args.cache_dir), link=args.link_static)
+    else:
+        # This build rewrites dest_dir behind the manifest's back.
+        invalidate_manifest(cache_path(args, MANIFEST_PATH))
+        copy_static("static", dest_dir)
+    if args.images:
+        set_image_attributes(build_images("static", dest_dir, cache_path(args, IMAGE_CACHE_DIR), jobs=args.jobs))
+        if cache is not None:
+            cache.context = hash_bytes(json.dumps(IMAGE_ATTRIBUTES, sort_keys=True).encode('utf-8'))
+    if args.incremental:
+        generate_pages_incremental("content", "template.html", dest_dir, args.basepath, cache_path(args, MANIFEST_PATH), jobs=args.jobs, cache=cache,
+                                   link_index=link_index, graph_path=cache_path(args, DEPGRAPH_PATH), artifacts=artifacts)
+    elif args.async_io:
+        asyncio.run(build_pages_async(args, dest_dir, link_index))
+    else:
+        generate_pages_recursive("content", "template.html", dest_dir, args.basepath, jobs=args.jobs, cache=cache, link_index=link_index, artifacts=artifacts)
+    if not args.incremental:
+        record_build(DependencyGraph(), "content", "template.html", dest_dir).save(cache_path(args, DEPGRAPH_PATH))
+    if cache is not None:
+        cache.save(cache_path(args, BLOCK_CACHE_PATH))
+        print(cache.stats())
+    if artifacts is not None:
+        print(artifacts.stats())
+        if args.cache_max_size is not None or args.cache_max_age is not None:
+            removed = artifacts.prune(args.cache_max_size * 1024 * 1024 if args.cache_max_size is not None else None,
+                                      args.cache_max_age * 86400 if args.cache_max_age is not None else None)
+            print(f"Artifact cache: pruned {removed} file(s)")
+    if args.site_url:
+        write_site_files(link_index, collect_pages("content", dest_dir), "content", dest_dir, args.site_url, args.basepath, args.feed_section, args.feed_author)
+    if args.minify or args.precompress:
+        optimize_output(dest_dir, cache_path(args, MANIFEST_PATH), minify=args.minify, precompress=args.precompress, jobs=args.jobs)
+    if args.link_index:
+        link_index.save(cache_path(args, LINK_INDEX_PATH))
+    if args.check_links:
+        broken = check_links(link_index, collect_pages("content", dest_dir), dest_dir)
+        print(report(broken))
+        if broken:
+            # Raised inside build(), so an --atomic build is not published.
+            raise SystemExit(1)
+
+def build_variants(args):
+    """Build every --variant in one pass: each page is parsed once and written once per variant."""
+    highlight.CACHE_DIR = HIGHLIGHT_CACHE_DIR
+    cache = BlockCache(args.block_cache_size).load(BLOCK_CACHE_PATH) if args.block_cache else None
+    for _, dest_dir in args.variant:
+        materialize(dest_dir)
+        if os.path.abspath(dest_dir) == os.path.abspath("docs"):
+            # Same as a plain build: docs/ is rewritten behind the manifest's back.
+            invalidate_manifest(MANIFEST_PATH)
+        copy_static("static", dest_dir)
+    if args.images:
+        for _, dest_dir in args.variant:
+            attributes = build_images("static", dest_dir, jobs=args.jobs)
+        set_image_attributes(attributes)
+        if cache is not None:
+            cache.context = hash_bytes(json.dumps(IMAGE_ATTRIBUTES, sort_keys=True).encode('utf-8'))
+    generate_page_variants(collect_page_variants("content", args.variant), "template.html", args.jobs, cache)
+    if cache is not None:
+        cache.save(BLOCK_CACHE_PATH)
+        print(cache.stats())
+    if args.minify or args.precompress:
+        for _, dest_dir in args.variant:
+            optimize_output(dest_dir, variant_manifest_path(dest_dir), minify=args.minify, precompress=args.precompress, jobs=args.jobs)
+
+async def build_pages_async(args, dest_dir, link_index=None):
+    if args.jobs == 1:
+        await build_async("content", "template.html", dest_dir, args.basepath, args.concurrency, link_index=link_index)
+        return
+    # Workers get the image attributes and highlight cache even where they don't inherit them (spawn).
+    with ProcessPoolExecutor(max_workers=args.jobs if args.jobs > 0 else None, initializer=_init_worker,
+                             initargs=(None, IMAGE_ATTRIBUTES, highlight.CACHE_DIR)) as executor:
+        await build_async("content", "template.html", dest_dir, args.basepath, args.concurrency, executor=executor, link_index=link_index)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.profile or args.cprofile:
+        return profile_main(args)
+    run(args)
+
+def run(args):
+    if args.explain:
+        path = args.explain
+        if os.path.normpath(path).startswith("docs" + os.sep):
+            path = os.path.relpath(path, "docs")
+        print(DependencyGraph().load(cache_path(args, DEPGRAPH_PATH)).explain(path))
+    elif args.rollback:
+        rollback("docs", build_state(args))
+    elif args.variant:
+        build_variants(args)
+    elif args.atomic:
+        staged_build("docs", lambda staging_dir: build(args, staging_dir), keep=args.keep, state_paths=build_state(args))
+    else:
+        # A plain build publishes docs/ as a directory again, even after --atomic builds.
+        materialize("docs")
+        build(args, "docs")
+
+def profile_main(args):
+    # Instrumentation patches this process only, so profiled builds render serially.
+    args.jobs = 1
+    profiler = Profiler()
+    c_profiler = cProfile.Profile() if args.cprofile else None
+    with profiler.installed():
+        if c_profiler is not None:
+            c_profiler.enable()
+        try:
+            run(args)
+        finally:
+            if c_profiler is not None:
+                c_profiler.disable()
+    if c_profiler is not None:
+        c_profiler.dump_stats(args.cprofile)
+        print(f"cProfile stats written to {args.cprofile}")
+    if args.profile:
+        profile_path = cache_path(args, PROFILE_PATH)
+        profiler.save(profile_path)
+        print(profiler.table(args.profile_top))
+        print(f"Profile written to {profile_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
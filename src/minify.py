@@ -0,0 +1,128 @@
+import gzip
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from atomicwrite import write_atomic
+from incremental import MANIFEST_PATH, hash_bytes, load_manifest, save_manifest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MINIFY_EXTENSIONS = (".html", ".css")
+COMPRESS_EXTENSIONS = (".html", ".css", ".js", ".svg", ".xml", ".json", ".txt")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+# Content of these elements is kept byte for byte (style is minified as CSS).
+RAW_ELEMENT_PATTERN = re.compile(r"(<(pre|code|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL)
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+# Whitespace next to block-level tags never renders, so it can go entirely.
+BLOCK_TAG_SPACE_PATTERN = re.compile(
+    r"\s*(</?(?:!doctype|html|head|body|meta|link|title|article|section|header|footer|nav|main|div|p|ul|ol|li|h[1-6]|blockquote|pre|table|thead|tbody|tr|td|th)\b[^>]*>)\s*",
+    re.IGNORECASE,
+)
+CSS_STRING_PATTERN = re.compile(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')")
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+def minify_css(css):
+    # Strings are split out first so their contents are never touched.
+    parts = CSS_STRING_PATTERN.split(CSS_COMMENT_PATTERN.sub("", css))
+    for i in range(0, len(parts), 2):
+        text = re.sub(r"\s+", " ", parts[i])
+        text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+        # Only the space after ":" goes; "a :hover" and "a:hover" are different selectors.
+        text = re.sub(r":\s+", ":", text)
+        parts[i] = text.replace(";}", "}")
+    return "".join(parts).strip()
+
+def minify_html_text(html):
+    html = COMMENT_PATTERN.sub("", html)
+    html = re.sub(r"\s+", " ", html)
+    return BLOCK_TAG_SPACE_PATTERN.sub(r"\1", html)
+
+def minify_html(html):
+    """Collapse whitespace and drop comments outside pre, code, textarea, script and style."""
+    out = []
+    position = 0
+    for match in RAW_ELEMENT_PATTERN.finditer(html):
+        out.append(minify_html_text(html[position:match.start()]))
+        opening, tag, body, closing = match.groups()
+        out.append(opening + (minify_css(body) if tag.lower() == "style" else body) + closing)
+        position = match.end()
+    out.append(minify_html_text(html[position:]))
+    return "".join(out).strip()
+
+def optimize_file(job):
+    """Minify and/or precompress one output file; return the hash of its final content."""
+    path, minify, precompress = job
+    with open(path, 'rb') as f:
+        data = f.read()
+    if minify and path.endswith(MINIFY_EXTENSIONS):
+        text = data.decode('utf-8')
+        minified = (minify_html(text) if path.endswith(".html") else minify_css(text)).encode('utf-8')
+        if minified != data:
+            data = minified
+            write_atomic(path, data)
+    if precompress and path.endswith(COMPRESS_EXTENSIONS):
+        # mtime=0 keeps the .gz byte-identical between builds.
+        write_atomic(path + ".gz", gzip.compress(data, 9, mtime=0))
+        if brotli is not None:
+            write_atomic(path + ".br", brotli.compress(data))
+    return hash_bytes(data)
+
+def is_done(path, precompress):
+    if not precompress or not path.endswith(COMPRESS_EXTENSIONS):
+        return True
+    if not os.path.exists(path + ".gz"):
+        return False
+    return brotli is None or os.path.exists(path + ".br")
+
+def optimize_output(dest_dir_path, manifest_path=MANIFEST_PATH, minify=True, precompress=True, jobs=1):
+    """Minify HTML and CSS and write .gz (and, with the brotli module, .br) siblings.
+
+    The manifest remembers the hash each file had after the last run, so files
+    that were not rewritten since are skipped.
+    """
+    manifest = load_manifest(manifest_path)
+    settings = f"minify={minify} precompress={precompress} brotli={brotli is not None}"
+    old_files = manifest.get("optimized", {}) if manifest.get("optimized_settings") == settings else {}
+    extensions = MINIFY_EXTENSIONS + COMPRESS_EXTENSIONS if precompress else MINIFY_EXTENSIONS
+    files = {}
+    work = []
+    for root, _, names in os.walk(dest_dir_path):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if name.endswith(COMPRESSED_SUFFIXES):
+                # Siblings of outputs that no longer exist are dropped.
+                if not os.path.exists(os.path.splitext(path)[0]):
+                    os.remove(path)
+                continue
+            if not name.endswith(extensions):
+                continue
+            relative = os.path.relpath(path, dest_dir_path)
+            with open(path, 'rb') as f:
+                digest = hash_bytes(f.read())
+            if old_files.get(relative) == digest and is_done(path, precompress):
+                files[relative] = digest
+            else:
+                work.append((relative, (path, minify, precompress)))
+
+    if jobs is not None and jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs_to_run = [job for _, job in work]
+    if jobs is None or jobs == 1 or len(jobs_to_run) < 2:
+        digests = [optimize_file(job) for job in jobs_to_run]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            digests = list(executor.map(optimize_file, jobs_to_run, chunksize=max(1, len(jobs_to_run) // (jobs * 8))))
+    for (relative, _), digest in zip(work, digests):
+        files[relative] = digest
+
+    manifest = load_manifest(manifest_path)
+    manifest["optimized"] = files
+    manifest["optimized_settings"] = settings
+    save_manifest(manifest, manifest_path)
+    print(f"Optimize: {len(work)} processed, {len(files) - len(work)} unchanged")
+    return len(work)
@@ -0,0 +1,159 @@
+import contextlib
+import json
+import os
+import sys
+import time
+import highlight
+import textnode
+from atomicwrite import open_atomic
+from htmlnode import LeafNode, ParentNode
+from template import Template
+
+PROFILE_PATH = os.path.join(".cache", "profile.json")
+STAGES = ("read", "markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "build_nodes", "highlight", "to_html", "template", "write")
+
+
+class TimedWriter:
+    def __init__(self, stream, profiler, stage):
+        self.stream = stream
+        self.profiler = profiler
+        self.stage = stage
+
+    def write(self, fragment):
+        self.profiler.start(self.stage)
+        try:
+            return self.stream.write(fragment)
+        finally:
+            self.profiler.stop()
+
+
+class Profiler:
+    """Per-page, per-stage wall time and net allocated blocks.
+
+    Stages are timed exclusively: time spent in a nested stage (for example
+    text_to_textnodes inside build_nodes) is only counted for the inner stage.
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.page = None
+        self.stack = []
+
+    def start(self, stage):
+        self.stack.append([stage, time.perf_counter(), sys.getallocatedblocks(), 0.0, 0])
+
+    def stop(self):
+        stage, started, blocks_before, child_seconds, child_blocks = self.stack.pop()
+        seconds = time.perf_counter() - started
+        blocks = sys.getallocatedblocks() - blocks_before
+        # Work outside any page (such as reading front matter for the feed) has no row to go in.
+        if self.page is not None:
+            stats = self.pages.setdefault(self.page, {"seconds": 0.0, "stages": {}})
+            entry = stats["stages"].setdefault(stage, {"seconds": 0.0, "blocks": 0, "calls": 0})
+            entry["seconds"] += seconds - child_seconds
+            entry["blocks"] += blocks - child_blocks
+            entry["calls"] += 1
+        if self.stack:
+            self.stack[-1][3] += seconds
+            self.stack[-1][4] += blocks
+
+    def timed(self, func, stage):
+        def wrapper(*args, **kwargs):
+            # Recursive calls (nested nodes) stay inside the outer measurement.
+            if self.stack and self.stack[-1][0] == stage:
+                return func(*args, **kwargs)
+            self.start(stage)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stop()
+        return wrapper
+
+    def timed_iter(self, iterable, stage):
+        iterator = iter(iterable)
+        while True:
+            self.start(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.stop()
+            yield item
+
+    def timed_page(self, render):
+        def wrapper(from_path, *args, **kwargs):
+            self.page = from_path
+            started = time.perf_counter()
+            try:
+                return render(from_path, *args, **kwargs)
+            finally:
+                self.pages.setdefault(from_path, {"seconds": 0.0, "stages": {}})["seconds"] += time.perf_counter() - started
+                self.page = None
+        return wrapper
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Patch the build pipeline with timing wrappers for the duration of the block."""
+        stream_markdown_html = textnode.stream_markdown_html
+        iter_blocks = textnode.iter_blocks
+        template_render_to = Template.render_to
+        def timed_stream_markdown_html(lines, stream, *args):
+            return stream_markdown_html(self.timed_iter(lines, "read"), stream, *args)
+        def timed_template_render_to(template, stream, values, content=None):
+            return template_render_to(template, TimedWriter(stream, self, "write"), values, content)
+        patches = [
+            (textnode, "render_page_file", self.timed_page(textnode.render_page_file)),
+            (textnode, "render_page_variants", self.timed_page(textnode.render_page_variants)),
+            (textnode, "scan_metadata", self.timed(textnode.scan_metadata, "read")),
+            (textnode, "stream_markdown_html", timed_stream_markdown_html),
+            (textnode, "iter_blocks", lambda lines: self.timed_iter(iter_blocks(lines), "markdown_to_blocks")),
+            (textnode, "block_handler", self.timed(textnode.block_handler, "block_to_block_type")),
+            (textnode, "text_to_textnodes", self.timed(textnode.text_to_textnodes, "text_to_textnodes")),
+            (textnode, "block_to_html_node", self.timed(textnode.block_to_html_node, "build_nodes")),
+            (highlight, "highlight", self.timed(highlight.highlight, "highlight")),
+            (LeafNode, "render_to", self.timed(LeafNode.render_to, "to_html")),
+            (ParentNode, "render_to", self.timed(ParentNode.render_to, "to_html")),
+            (Template, "render_to", self.timed(timed_template_render_to, "template")),
+        ]
+        originals = [(owner, name, getattr(owner, name)) for owner, name, _ in patches]
+        for owner, name, replacement in patches:
+            setattr(owner, name, replacement)
+        try:
+            yield self
+        finally:
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+
+    def aggregate(self):
+        totals = {stage: {"seconds": 0.0, "blocks": 0, "calls": 0} for stage in STAGES}
+        for stats in self.pages.values():
+            for stage, entry in stats["stages"].items():
+                for field in ("seconds", "blocks", "calls"):
+                    totals[stage][field] += entry[field]
+        return totals
+
+    def report(self):
+        return {
+            "pages": self.pages,
+            "aggregate": self.aggregate(),
+            "total_seconds": sum(stats["seconds"] for stats in self.pages.values()),
+        }
+
+    def save(self, path):
+        with open_atomic(path) as f:
+            json.dump(self.report(), f, indent=1)
+
+    def table(self, top=10):
+        lines = []
+        total = sum(stats["seconds"] for stats in self.pages.values()) or 1e-9
+        lines.append(f"{'stage':<22}{'ms':>10}{'share':>8}{'net blocks':>12}")
+        for stage, entry in self.aggregate().items():
+            lines.append(f"{stage:<22}{entry['seconds'] * 1000:>10.1f}{entry['seconds'] / total:>8.0%}{entry['blocks']:>12}")
+        lines.append("")
+        lines.append(f"{'slowest pages':<50}{'ms':>10}  slowest stage")
+        slowest = sorted(self.pages.items(), key=lambda item: item[1]["seconds"], reverse=True)[:top]
+        for path, stats in slowest:
+            stage = max(stats["stages"].items(), key=lambda item: item[1]["seconds"], default=("-", None))[0]
+            lines.append(f"{path:<50}{stats['seconds'] * 1000:>10.1f}  {stage}")
+        return "\n".join(lines)
@@ -0,0 +1,153 @@
+import os
+import shutil
+import time
+
+BUILDS_DIR = ".builds"
+
+
+def builds_root(dest_dir):
+    return os.path.join(os.path.dirname(os.path.abspath(dest_dir)), BUILDS_DIR)
+
+def list_builds(dest_dir):
+    root = builds_root(dest_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(os.path.join(root, name) for name in os.listdir(root) if name.startswith("build-"))
+
+def current_build(dest_dir):
+    if os.path.islink(dest_dir):
+        return os.path.realpath(dest_dir)
+    return None
+
+def new_build_path(dest_dir):
+    # time_ns has a fixed width for the foreseeable future, so names sort chronologically.
+    return os.path.join(builds_root(dest_dir), f"build-{time.time_ns()}")
+
+def clone_tree(source_dir, target_dir):
+    """Recreate source_dir at target_dir with hardlinks, falling back to copies across filesystems."""
+    for root, _, names in os.walk(source_dir):
+        target_root = os.path.join(target_dir, os.path.relpath(root, source_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for name in names:
+            source_path = os.path.join(root, name)
+            target_path = os.path.join(target_root, name)
+            try:
+                os.link(source_path, target_path)
+            except OSError:
+                shutil.copy2(source_path, target_path)
+
+def point_to(dest_dir, build_path):
+    # A symlink is replaced with os.replace, which readers observe atomically.
+    link_target = os.path.relpath(build_path, os.path.dirname(os.path.abspath(dest_dir)))
+    tmp_link = dest_dir.rstrip(os.sep) + ".tmp-link"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(link_target, tmp_link)
+    if os.path.isdir(dest_dir) and not os.path.islink(dest_dir):
+        # First staged build: move the plain directory aside as the oldest rollback target.
+        os.rename(dest_dir, os.path.join(builds_root(dest_dir), f"build-0-{time.time_ns()}"))
+    os.replace(tmp_link, dest_dir)
+
+def materialize(dest_dir):
+    """Turn dest_dir back into a plain directory if staged_build made it a symlink.
+
+    The files of the build it points to are hardlinked into the new directory, so
+    an incremental build can go on from them without writing into that build.
+    """
+    if not os.path.islink(dest_dir):
+        return False
+    target = os.path.realpath(dest_dir)
+    tmp_dir = dest_dir.rstrip(os.sep) + ".tmp-dir"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    if os.path.isdir(target):
+        clone_tree(target, tmp_dir)
+    else:
+        os.makedirs(tmp_dir)
+    os.remove(dest_dir)
+    os.rename(tmp_dir, dest_dir)
+    return True
+
+def state_dir(build_path):
+    # Next to the builds rather than inside them, so state files are never published.
+    return os.path.join(os.path.dirname(build_path), "state", os.path.basename(build_path))
+
+def save_state(build_path, state_paths):
+    directory = state_dir(build_path)
+    os.makedirs(directory, exist_ok=True)
+    for path in state_paths:
+        saved = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(path):
+            shutil.copy2(path, saved)
+        elif os.path.exists(saved):
+            os.remove(saved)
+
+def restore_state(build_path, state_paths):
+    """Put back the state files saved with build_path. Those it has no copy of are
+    removed, since whatever they describe is no longer the published output."""
+    directory = state_dir(build_path)
+    for path in state_paths:
+        saved = os.path.join(directory, os.path.basename(path))
+        if os.path.exists(saved):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            shutil.copy2(saved, path + ".tmp")
+            os.replace(path + ".tmp", path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def remove_build(build_path):
+    shutil.rmtree(build_path, ignore_errors=True)
+    shutil.rmtree(state_dir(build_path), ignore_errors=True)
+
+def prune_builds(dest_dir, keep):
+    current = current_build(dest_dir)
+    previous = [path for path in list_builds(dest_dir) if path != current]
+    stale = previous[:-keep] if keep > 0 else previous
+    for path in stale:
+        remove_build(path)
+    return stale
+
+def staged_build(dest_dir, build, keep=2, state_paths=()):
+    """Run build(staging_dir) and publish the result by flipping dest_dir to it.
+
+    The staging directory starts as a hardlink clone of the live output, so an
+    incremental build only writes the files that changed. Pages and assets are
+    always written through a temporary name and os.replace, which breaks the
+    link instead of modifying the previous build in place.
+
+    state_paths are files (such as the incremental manifest) that describe the
+    output. They are put back if the build fails, and saved with each published
+    build so that rollback() can restore them along with it.
+    """
+    previous = current_build(dest_dir) or (dest_dir if os.path.isdir(dest_dir) else None)
+    staging = new_build_path(dest_dir)
+    os.makedirs(os.path.dirname(staging), exist_ok=True)
+    if previous is not None:
+        clone_tree(previous, staging)
+    else:
+        os.makedirs(staging)
+    save_state(staging, state_paths)
+    try:
+        build(staging)
+    except BaseException:
+        restore_state(staging, state_paths)
+        remove_build(staging)
+        raise
+    save_state(staging, state_paths)
+    point_to(dest_dir, staging)
+    pruned = prune_builds(dest_dir, keep)
+    print(f"Published {os.path.basename(staging)} to {dest_dir} ({len(pruned)} old build(s) pruned)")
+    return staging
+
+def rollback(dest_dir, state_paths=()):
+    current = current_build(dest_dir)
+    builds = list_builds(dest_dir)
+    if current not in builds or builds.index(current) == 0:
+        raise Exception("no previous build to roll back to")
+    target = builds[builds.index(current) - 1]
+    point_to(dest_dir, target)
+    restore_state(target, state_paths)
+    # Builds newer than the rollback target are dropped so the next rollback goes further back.
+    remove_build(current)
+    print(f"Rolled back {dest_dir} to {os.path.basename(target)}")
+    return target
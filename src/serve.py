@@ -0,0 +1,362 @@
+import argparse
+import ctypes
+import ctypes.util
+import functools
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from textnode import collect_pages, copy_static, generate_page, generate_pages, listing_dir, listings_read, page_metadata
+from depgraph import DependencyGraph, listing_input, metadata_input, page_inputs, record_build
+from incremental import MANIFEST_PATH, copy_asset, invalidate_manifest
+
+RELOAD_PATH = "/__reload"
+RELOAD_SCRIPT = f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();</script>'
+
+
+def snapshot(paths):
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            files[path] = os.stat(path).st_mtime_ns
+            continue
+        for root, _, names in os.walk(path):
+            for name in names:
+                full_path = os.path.join(root, name)
+                try:
+                    files[full_path] = os.stat(full_path).st_mtime_ns
+                except FileNotFoundError:
+                    pass
+    return files
+
+
+class PollingWatcher:
+    def __init__(self, paths, interval=0.3):
+        self.paths = paths
+        self.interval = interval
+        self.files = snapshot(paths)
+
+    def wait(self):
+        while True:
+            time.sleep(self.interval)
+            current = snapshot(self.paths)
+            changed = {path for path in current.keys() | self.files.keys() if current.get(path) != self.files.get(path)}
+            self.files = current
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    # Raw inotify through libc, so watching needs no third-party package.
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, paths, settle=0.05):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError("inotify is not available on this platform")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+        self.settle = settle
+        self.watches = {}
+        self.files = set()
+        for path in paths:
+            if os.path.isfile(path):
+                # Editors often replace files on save, so watch the parent and filter by name.
+                self.files.add(os.path.normpath(path))
+                self.add_watch(os.path.dirname(path) or ".")
+            else:
+                for root, _, _ in os.walk(path):
+                    self.add_watch(root)
+        self.roots = [os.path.normpath(path) for path in paths if not os.path.isfile(path)]
+
+    def add_watch(self, directory):
+        descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if descriptor < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.watches[descriptor] = directory
+
+    def wanted(self, path):
+        path = os.path.normpath(path)
+        return path in self.files or any(path == root or path.startswith(root + os.sep) for root in self.roots)
+
+    def read_events(self):
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            descriptor, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode()
+            offset += length
+            path = os.path.join(self.watches.get(descriptor, ""), name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and self.wanted(path):
+                    for root, _, names in os.walk(path):
+                        self.add_watch(root)
+                        changed.update(os.path.join(root, n) for n in names)
+            elif self.wanted(path):
+                changed.add(path)
+        return changed
+
+    def wait(self):
+        changed = set()
+        while not changed:
+            changed = self.read_events()
+        # Saves usually arrive as a burst of events; collect the rest of the burst.
+        time.sleep(self.settle)
+        while select.select([self.fd], [], [], 0)[0]:
+            changed |= self.read_events()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(paths, polling=False):
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(paths)
+
+
+class ReloadHub:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.generation = 0
+
+    def push(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout=15):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    hub = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            return self.serve_events()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path) and self.path.endswith(("/", ".html")):
+            return self.serve_page(path)
+        return super().do_GET()
+
+    def serve_page(self, path):
+        with open(path, 'rb') as f:
+            body = f.read()
+        script = RELOAD_SCRIPT.encode()
+        if b"</body>" in body:
+            body = body.replace(b"</body>", script + b"</body>", 1)
+        else:
+            body += script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.hub.generation
+        try:
+            while True:
+                current = self.hub.wait(generation)
+                if current != generation:
+                    self.wfile.write(b"data: reload\n\n")
+                    generation = current
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DevSite:
+    """In-memory state of a watched build: which outputs each source and static file produced."""
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath, jobs=1, manifest_path=MANIFEST_PATH):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.jobs = jobs
+        self.manifest_path = manifest_path
+        self.pages = {}
+        self.metadata = {}
+        self.graph = DependencyGraph()
+
+    def build_all(self):
+        # Rebuilds write dest_dir without the manifest, so a later --incremental build must not trust it.
+        invalidate_manifest(self.manifest_path)
+        copy_static(self.static_dir, self.dest_dir)
+        self.pages = dict(collect_pages(self.content_dir, self.dest_dir))
+        generate_pages(list(self.pages.items()), self.template_path, self.basepath, self.jobs)
+        self.metadata = {from_path: page_metadata(from_path) for from_path in self.pages}
+        record_build(self.graph, self.content_dir, self.template_path, self.dest_dir)
+
+    def page_dest(self, from_path):
+        relative = os.path.relpath(from_path, self.content_dir)
+        return os.path.join(self.dest_dir, relative[:-len(".md")] + ".html")
+
+    def apply(self, changed):
+        # An --incremental build may have run in between and recorded the output again.
+        invalidate_manifest(self.manifest_path)
+        rebuilt = 0
+        if any(os.path.normpath(path) == os.path.normpath(self.template_path) for path in changed):
+            if self.jobs == 1:
+                for from_path in sorted(self.pages):
+                    self.render_page(from_path)
+            else:
+                try:
+                    generate_pages(list(self.pages.items()), self.template_path, self.basepath, self.jobs)
+                except Exception as e:
+                    print(f"  failed: {e}")
+            rebuilt += len(self.pages)
+        for path in sorted(changed):
+            if is_inside(path, self.content_dir) and path.endswith(".md"):
+                rebuilt += self.apply_page(path)
+            elif is_inside(path, self.static_dir):
+                rebuilt += self.apply_static(path)
+        return rebuilt
+
+    def render_page(self, from_path):
+        try:
+            generate_page(from_path, self.template_path, self.pages[from_path], self.basepath)
+        except Exception as e:
+            print(f"  failed: {from_path}: {e}")
+
+    def apply_page(self, from_path):
+        dest_path = self.pages.get(from_path) or self.page_dest(from_path)
+        output = os.path.relpath(dest_path, self.dest_dir)
+        if not os.path.exists(from_path):
+            self.pages.pop(from_path, None)
+            self.metadata.pop(from_path, None)
+            self.graph.forget(output)
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            return 1 + self.apply_dependents([metadata_input(from_path), listing_input(listing_dir(from_path))], from_path)
+        added = from_path not in self.pages
+        self.pages[from_path] = dest_path
+        self.render_page(from_path)
+        self.graph.record(output, page_inputs(from_path, self.template_path, listings_read(from_path)))
+        # Pages listing this one only change with its title or front matter, or when it is new.
+        changed_inputs = [listing_input(listing_dir(from_path))] if added else []
+        metadata = page_metadata(from_path)
+        if added or self.metadata.get(from_path) != metadata:
+            changed_inputs.append(metadata_input(from_path))
+        self.metadata[from_path] = metadata
+        return 1 + self.apply_dependents(changed_inputs, from_path)
+
+    def apply_dependents(self, changed_inputs, from_path):
+        if not changed_inputs:
+            return 0
+        sources = {os.path.relpath(dest_path, self.dest_dir): source for source, dest_path in self.pages.items()}
+        rebuilt = 0
+        for output in self.graph.dependents(changed_inputs):
+            source = sources.get(output)
+            if source is not None and source != from_path:
+                self.render_page(source)
+                rebuilt += 1
+        return rebuilt
+
+    def apply_static(self, path):
+        dest_path = os.path.join(self.dest_dir, os.path.relpath(path, self.static_dir))
+        if os.path.exists(path):
+            copy_asset(path, dest_path)
+        elif os.path.exists(dest_path):
+            os.remove(dest_path)
+        return 1
+
+
+def is_inside(path, directory):
+    path = os.path.normpath(path)
+    directory = os.path.normpath(directory)
+    return path.startswith(directory + os.sep)
+
+def latest_mtime(paths):
+    times = [os.stat(path).st_mtime for path in paths if os.path.exists(path)]
+    return max(times) if times else None
+
+def watch_loop(site, watcher, hub):
+    while True:
+        # One bad rebuild must not end the thread; the server would go on without watching.
+        try:
+            changed = watcher.wait()
+            started = time.time()
+            saved_at = latest_mtime(changed) or started
+            rebuilt = site.apply(changed)
+        except Exception as e:
+            print(f"Rebuild failed: {type(e).__name__}: {e}")
+            continue
+        if not rebuilt:
+            continue
+        hub.push()
+        finished = time.time()
+        print(f"Rebuilt {rebuilt} file(s) in {(finished - started) * 1000:.0f} ms; "
+              f"reload pushed {(finished - saved_at) * 1000:.0f} ms after save")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Serve docs/ and rebuild on change.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served under (default: /)")
+    parser.add_argument("--watch", action="store_true", help="rebuild changed files and live-reload open browsers")
+    parser.add_argument("--poll", action="store_true", help="poll for changes instead of using inotify")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for full rebuilds")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    site = DevSite("content", "static", "template.html", "docs", args.basepath, args.jobs)
+    site.build_all()
+    hub = ReloadHub()
+    handler = functools.partial(type("Handler", (DevRequestHandler,), {"hub": hub}), directory=site.dest_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    server.daemon_threads = True
+    if args.watch:
+        watcher = make_watcher([site.content_dir, site.static_dir, site.template_path], args.poll)
+        threading.Thread(target=watch_loop, args=(site, watcher, hub), daemon=True).start()
+        print(f"Watching content/, static/ and template.html with {type(watcher).__name__}")
+    print(f"Serving docs/ at http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
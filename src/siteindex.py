@@ -0,0 +1,182 @@
+import json
+import os
+import re
+import time
+from xml.sax.saxutils import escape, quoteattr
+from atomicwrite import open_atomic
+from textnode import LinkIndex, page_metadata
+
+TERM_PATTERN = re.compile(r"\w{2,}")
+FEED_ENTRIES = 20
+RFC3339_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})")
+
+
+def page_terms(textnodes):
+    """Distinct lowercase words of a page's text (link and image text included, URLs not)."""
+    terms = set()
+    for node in textnodes:
+        terms.update(TERM_PATTERN.findall(node.text.lower()))
+    return sorted(terms)
+
+
+class SiteIndex(LinkIndex):
+    """A LinkIndex that also keeps each page's search terms, for sitemap, feed and search output."""
+
+    def __init__(self):
+        super().__init__()
+        self.terms = {}
+
+    @classmethod
+    def page_summary(cls, textnodes):
+        return cls.page_links(textnodes), page_terms(textnodes)
+
+    def add_summary(self, page, summary):
+        links, terms = summary
+        self.pages[page] = links
+        self.terms[page] = terms
+
+    def has_entry(self, entry):
+        return super().has_entry(entry) and "terms" in entry
+
+    def to_entry(self, page, entry):
+        super().to_entry(page, entry)
+        entry["terms"] = self.terms[page]
+
+    def from_entry(self, page, entry):
+        super().from_entry(page, entry)
+        self.terms[page] = entry["terms"]
+
+    def __repr__(self):
+        return f"SiteIndex(pages = {len(self.pages)})"
+
+
+def page_url(dest_path, dest_dir_path):
+    relative = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if relative == "index.html":
+        return ""
+    if relative.endswith("/index.html"):
+        return relative[:-len("index.html")]
+    return relative
+
+def page_updated(from_path, metadata):
+    # RFC 3339, from the front matter date if there is one, else the source's mtime.
+    # A date in any other form is ignored: feed readers and crawlers reject it.
+    date = metadata.get("date")
+    if isinstance(date, str) and re.fullmatch(r"\d{4}-\d{2}-\d{2}", date):
+        return date + "T00:00:00Z"
+    if isinstance(date, str) and RFC3339_PATTERN.fullmatch(date):
+        return date
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(os.stat(from_path).st_mtime))
+
+def write_sitemap(path, entries):
+    with open_atomic(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url, _, updated, _ in entries:
+            f.write(f"<url><loc>{escape(url)}</loc><lastmod>{escape(updated)}</lastmod></url>\n")
+        f.write("</urlset>\n")
+
+def write_feed(path, feed_url, site_url, site_title, entries, author):
+    """Atom feed of the newest entries. Atom requires an author, so the feed always names one."""
+    entries = sorted(entries, key=lambda entry: entry[2], reverse=True)[:FEED_ENTRIES]
+    updated = entries[0][2] if entries else "1970-01-01T00:00:00Z"
+    with open_atomic(path) as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"<title>{escape(site_title)}</title><id>{escape(site_url)}</id>"
+                f"<link href={quoteattr(site_url)}/><link rel=\"self\" href={quoteattr(feed_url)}/><updated>{escape(updated)}</updated>"
+                f"<author><name>{escape(author)}</name></author>\n")
+        for url, title, entry_updated, _ in entries:
+            f.write(f"<entry><title>{escape(title)}</title><id>{escape(url)}</id>"
+                    f"<link href={quoteattr(url)}/><updated>{escape(entry_updated)}</updated></entry>\n")
+        f.write("</feed>\n")
+
+def encode_terms(terms):
+    """Front-code sorted terms as a flat [shared, suffix, shared, suffix, ...] list."""
+    encoded = []
+    previous = ""
+    for term in terms:
+        shared = 0
+        limit = min(len(previous), len(term))
+        while shared < limit and previous[shared] == term[shared]:
+            shared += 1
+        encoded.append(shared)
+        encoded.append(term[shared:])
+        previous = term
+    return encoded
+
+def decode_terms(encoded):
+    terms = []
+    previous = ""
+    for i in range(0, len(encoded), 2):
+        previous = previous[:encoded[i]] + encoded[i + 1]
+        terms.append(previous)
+    return terms
+
+def write_search_index(path, documents, terms_by_document):
+    """documents: [(url, title)]; terms_by_document: the terms of each document, in the same order.
+
+    Page ids are positions in documents. Each posting list is delta-encoded
+    (first id, then gaps), which keeps the numbers, and so the file, small.
+    """
+    postings = {}
+    for page_id, terms in enumerate(terms_by_document):
+        for term in terms:
+            postings.setdefault(term, []).append(page_id)
+    terms = sorted(postings)
+    deltas = []
+    for term in terms:
+        ids = postings[term]
+        deltas.append([ids[0]] + [ids[i] - ids[i - 1] for i in range(1, len(ids))])
+    with open_atomic(path) as f:
+        json.dump({"version": 1, "pages": documents, "terms": encode_terms(terms), "postings": deltas}, f, separators=(",", ":"))
+
+def search(index, query):
+    """Urls of the pages containing every word of query, using a loaded search index."""
+    postings = {}
+    for term, deltas in zip(decode_terms(index["terms"]), index["postings"]):
+        ids = []
+        for delta in deltas:
+            ids.append(delta if not ids else ids[-1] + delta)
+        postings[term] = set(ids)
+    matches = None
+    for word in TERM_PATTERN.findall(query.lower()):
+        ids = postings.get(word, set())
+        matches = ids if matches is None else matches & ids
+    return [index["pages"][page_id][0] for page_id in sorted(matches or ())]
+
+def write_site_files(site_index, pages, dir_path_content, dest_dir_path, site_url, basepath="/", feed_section="blog", feed_author=None):
+    """Write sitemap.xml, feed.xml and search.json into dest_dir_path from what the build collected.
+
+    Titles and dates come from the metadata scan of each page's head; search
+    terms come from the TextNodes the render produced. No page is parsed again.
+    The feed author is feed_author, else the home page's "author" front matter,
+    else the site title.
+    """
+    root_url = site_url.rstrip("/") + basepath
+    section = os.path.join(dir_path_content, feed_section) + os.sep
+    entries = []
+    feed_entries = []
+    documents = []
+    terms_by_document = []
+    site_title = ""
+    site_author = ""
+    for from_path, dest_path in sorted(pages, key=lambda page: page_url(page[1], dest_dir_path)):
+        metadata = page_metadata(from_path)
+        path = page_url(dest_path, dest_dir_path)
+        entry = (root_url + path, metadata.get("title", ""), page_updated(from_path, metadata), from_path)
+        entries.append(entry)
+        documents.append([basepath + path, entry[1]])
+        terms_by_document.append(site_index.terms.get(from_path, []))
+        if from_path.startswith(section) and from_path != os.path.join(dir_path_content, feed_section, "index.md"):
+            feed_entries.append(entry)
+        if path == "":
+            site_title = entry[1]
+            site_author = metadata.get("author", "")
+    write_sitemap(os.path.join(dest_dir_path, "sitemap.xml"), entries)
+    if isinstance(site_author, list):
+        site_author = ", ".join(site_author)
+    write_feed(os.path.join(dest_dir_path, "feed.xml"), root_url + "feed.xml", root_url, site_title, feed_entries,
+               feed_author or site_author or site_title)
+    write_search_index(os.path.join(dest_dir_path, "search.json"), documents, terms_by_document)
+    print(f"Site files: sitemap.xml ({len(entries)} pages), feed.xml ({min(len(feed_entries), FEED_ENTRIES)} entries), search.json")
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """Base for tests that need files on disk: each test gets a fresh self.root.
+
+    write() and read() take paths relative to self.root (absolute paths are used
+    as they are) and create parent directories as needed.
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def write(self, path, data):
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, 'wb') as f:
+                f.write(data)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        return path
+
+    def read(self, path):
+        with open(self.path(path), 'r', encoding='utf-8') as f:
+            return f.read()
@@ -0,0 +1,59 @@
+import os
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+def rewrite_basepath(html, basepath):
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+
+class Template:
+    def __init__(self, text, basepath="/"):
+        # Alternating literal / placeholder-name list, always starting and ending with a literal.
+        # The basepath rewrite is applied to the literals once here instead of to every page.
+        self.segments = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.segments.append(rewrite_basepath(text[position:match.start()], basepath))
+            self.segments.append(match.group(1))
+            position = match.end()
+        self.segments.append(rewrite_basepath(text[position:], basepath))
+
+    @property
+    def placeholders(self):
+        return self.segments[1::2]
+
+    def render(self, values):
+        parts = self.segments[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = values.get(parts[i], "")
+        return "".join(parts)
+
+    def render_to(self, stream, values, content=None):
+        """Write the page to stream; `content`, if given, is called with the stream to fill {{ Content }}."""
+        stream.write(self.segments[0])
+        for i in range(1, len(self.segments), 2):
+            name = self.segments[i]
+            if name == "Content" and content is not None:
+                content(stream)
+            else:
+                stream.write(values.get(name, ""))
+            stream.write(self.segments[i + 1])
+
+    def __repr__(self):
+        return f"Template(placeholders = {self.placeholders})"
+
+
+_template_cache = {}
+
+def load_template(template_path, basepath="/"):
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), basepath)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = Template(f.read(), basepath)
+    _template_cache[key] = ((stat.st_mtime_ns, stat.st_size), template)
+    return template
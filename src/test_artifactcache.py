@@ -0,0 +1,83 @@
+import unittest
+import contextlib
+import io
+import os
+import time
+from artifactcache import ArtifactCache
+from textnode import LinkIndex, collect_pages, generate_pages
+from tempdir import TempDirTestCase
+
+TEMPLATE = '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}'
+
+class TestArtifactCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.cache_dir = os.path.join(self.root, "ci-cache")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nA [link](/)")
+
+    def build(self, dest="docs", link_index=None, artifacts=None):
+        # Each build starts from a fresh output directory, as a CI run would.
+        artifacts = artifacts or ArtifactCache(self.cache_dir)
+        pages = collect_pages(self.content, os.path.join(self.root, dest))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages(pages, self.template, "/site/", link_index=link_index, artifacts=artifacts)
+        return artifacts, pages
+
+    def test_restored_pages_match_rendered_pages(self):
+        first, pages = self.build("first")
+        self.assertEqual((first.restored, first.stored), (0, 2))
+        second, restored_pages = self.build("second")
+        self.assertEqual((second.restored, second.stored), (2, 0))
+        for (_, a), (_, b) in zip(pages, restored_pages):
+            self.assertEqual(self.read(a), self.read(b))
+
+    def test_link_index_is_restored(self):
+        self.build("first")
+        link_index = LinkIndex()
+        artifacts, _ = self.build("second", link_index)
+        # Entries stored without a link index can't answer for one, so those pages render again.
+        self.assertEqual(artifacts.restored, 0)
+        restored = LinkIndex()
+        artifacts, _ = self.build("third", restored)
+        self.assertEqual(artifacts.restored, 2)
+        self.assertEqual(restored.pages, link_index.pages)
+
+    def test_changed_inputs_miss(self):
+        self.build()
+        # The listing on the home page shows the post's title, so both pages change.
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Renamed\n\nA [link](/)")
+        artifacts, _ = self.build()
+        self.assertEqual((artifacts.restored, artifacts.stored), (0, 2))
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Renamed\n\nNew text")
+        artifacts, _ = self.build()
+        self.assertEqual((artifacts.restored, artifacts.stored), (1, 1))
+
+    def test_renderer_change_misses(self):
+        self.build()
+        artifacts = ArtifactCache(self.cache_dir)
+        artifacts.renderer = "patched"
+        self.build(artifacts=artifacts)
+        self.assertEqual((artifacts.restored, artifacts.stored), (0, 2))
+
+    def test_prune_by_age_and_size(self):
+        artifacts, _ = self.build(link_index=LinkIndex())
+        old = time.time() - 10 * 86400
+        for root, _, names in os.walk(os.path.join(self.cache_dir, "pages")):
+            for name in names:
+                os.utime(os.path.join(root, name), (old, old))
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        # The post is restored, which marks it and its sidecar as used; the old home page entry is not.
+        self.build(link_index=LinkIndex())
+        self.assertEqual(artifacts.prune(max_age=86400), 2)
+        restored = self.build(link_index=LinkIndex())[0].restored
+        self.assertEqual(restored, 2)
+        self.assertEqual(artifacts.prune(max_bytes=0), 4)
+        artifacts, _ = self.build()
+        self.assertEqual(artifacts.restored, 0)
+
+if __name__ == "__main__":
+    unittest.main()
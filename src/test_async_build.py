@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import contextlib
+import io
+import os
+import threading
+from async_build import LocalFS, build_async
+from textnode import collect_pages, generate_pages_recursive
+from tempdir import TempDirTestCase
+
+class RecordingFS(LocalFS):
+    def __init__(self):
+        self.calls = []
+
+    def read_text(self, path):
+        self.calls.append(("read", path))
+        return super().read_text(path)
+
+class InFlightFS(LocalFS):
+    """Counts pages between their read and their write."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def read_text(self, path):
+        if path.endswith(".md"):
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+        return super().read_text(path)
+
+    def write_text(self, path, text):
+        super().write_text(path, text)
+        with self.lock:
+            self.in_flight -= 1
+
+class TestBuildAsync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for path in ("index.md", os.path.join("blog", "a", "index.md"), os.path.join("blog", "b", "index.md")):
+            self.write(os.path.join("content", path), f"# {path}\n\nA [link](/blog) and `code`")
+
+    def build(self, dest, fs=None, concurrency=4):
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(build_async(os.path.join(self.root, "content"), self.template, os.path.join(self.root, dest), "/site/", concurrency, fs))
+
+    def test_output_matches_synchronous_build(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(os.path.join(self.root, "content"), self.template, os.path.join(self.root, "sync"), "/site/")
+        self.build("async")
+        for _, sync_path in collect_pages(os.path.join(self.root, "content"), os.path.join(self.root, "sync")):
+            async_path = sync_path.replace(os.path.join(self.root, "sync"), os.path.join(self.root, "async"))
+            with open(sync_path, 'rb') as a, open(async_path, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_uses_given_filesystem(self):
+        fs = RecordingFS()
+        self.build("async", fs)
+        self.assertEqual(len([call for call in fs.calls if call[1].endswith(".md")]), 3)
+
+    def test_pages_in_flight_are_bounded(self):
+        for i in range(10):
+            self.write(os.path.join("content", "blog", f"post{i}.md"), f"# Post {i}")
+        fs = InFlightFS()
+        self.build("async", fs, concurrency=2)
+        self.assertLessEqual(fs.peak, 2)
+        self.assertEqual(len(os.listdir(os.path.join(self.root, "async", "blog"))), 12)
+
+    def test_failures_are_collected(self):
+        self.write(os.path.join("content", "broken", "index.md"), "no title")
+        with self.assertRaises(Exception) as ctx:
+            self.build("async")
+        self.assertIn("broken", str(ctx.exception))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "async", "blog", "b", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
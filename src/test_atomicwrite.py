@@ -0,0 +1,33 @@
+import unittest
+import os
+from atomicwrite import open_atomic, write_atomic
+from tempdir import TempDirTestCase
+
+class TestAtomicWrite(TempDirTestCase):
+    def test_write_creates_parents(self):
+        path = self.path("a", "b", "page.html")
+        write_atomic(path, "<p>hi</p>")
+        self.assertEqual(self.read(path), "<p>hi</p>")
+        write_atomic(path, b"bytes")
+        self.assertEqual(self.read(path), "bytes")
+        self.assertEqual(os.listdir(self.path("a", "b")), ["page.html"])
+
+    def test_hardlinked_file_is_replaced(self):
+        path = self.write("page.html", "old")
+        os.link(path, self.path("previous.html"))
+        write_atomic(path, "new")
+        self.assertEqual(self.read("previous.html"), "old")
+        self.assertEqual(self.read("page.html"), "new")
+
+    def test_failed_write_keeps_old_file(self):
+        path = self.write("index.json", "old")
+        with self.assertRaises(RuntimeError):
+            with open_atomic(path) as f:
+                f.write("half")
+                raise RuntimeError("boom")
+        self.assertEqual(self.read("index.json"), "old")
+        self.assertEqual(os.listdir(self.root), ["index.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
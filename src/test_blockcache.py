@@ -0,0 +1,81 @@
+import unittest
+import json
+import os
+import tempfile
+from blockcache import BlockCache
+from textnode import TextNode, TextType, markdown_to_html_node
+
+MARKDOWN = "# Title\n\nShared **footer** text\n\n- a\n- b\n\nShared **footer** text"
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("block"))
+        cache.put("block", "<p>block</p>")
+        self.assertEqual(cache.get("block"), ("<p>block</p>", []))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")[0], "A")
+        self.assertEqual(cache.get("c")[0], "C")
+
+    def test_cached_render_matches_uncached(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual(cache.hits, 5)
+
+    def test_textnodes_survive_cache_hits(self):
+        cache = BlockCache()
+        expected = []
+        markdown_to_html_node(MARKDOWN, None, expected)
+        markdown_to_html_node(MARKDOWN, cache, [])
+        cached = []
+        markdown_to_html_node(MARKDOWN, cache, cached)
+        self.assertEqual(cached, expected)
+        self.assertIn(TextNode("footer", TextType.BOLD), cached)
+
+    def test_entries_are_kept_per_basepath(self):
+        cache = BlockCache()
+        markdown = "[home](/)"
+        self.assertEqual(markdown_to_html_node(markdown, cache, basepath="/site/").to_html(), '<div><p><a href="/site/">home</a></p></div>')
+        self.assertEqual(markdown_to_html_node(markdown, cache).to_html(), '<div><p><a href="/">home</a></p></div>')
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.get(markdown, "/site/")[0], '<p><a href="/site/">home</a></p>')
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "blocks.json")
+            cache = BlockCache()
+            cache.put("block", "<p>block</p>")
+            cache.save(path)
+            self.assertEqual(BlockCache().load(path).get("block"), ("<p>block</p>", []))
+
+    def test_stale_renderer_is_discarded(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "blocks.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"renderer": "old", "entries": [[BlockCache.key("block"), ["<p>old</p>", []]]]}, f)
+            self.assertIsNone(BlockCache().load(path).get("block"))
+
+    def test_drain_and_merge(self):
+        worker = BlockCache()
+        worker.get("x")
+        worker.put("x", "X")
+        parent = BlockCache()
+        parent.merge(worker.drain())
+        self.assertEqual((parent.hits, parent.misses), (0, 1))
+        self.assertEqual(parent.get("x")[0], "X")
+        self.assertEqual(worker.drain(), ([], 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
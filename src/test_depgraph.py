@@ -0,0 +1,50 @@
+import unittest
+import contextlib
+import io
+import os
+from depgraph import DependencyGraph, metadata_input, page_inputs, record_build
+from textnode import generate_pages_recursive, listings_read
+from tempdir import TempDirTestCase
+
+
+class TestDependencyGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom")
+
+    def test_listing_page_reads_listed_metadata(self):
+        tom = os.path.join(self.content, "blog", "tom", "index.md")
+        inputs = page_inputs(os.path.join(self.content, "index.md"), self.template)
+        self.assertIn(metadata_input(tom), inputs)
+        self.assertNotIn(tom, inputs)
+
+    def test_rendered_page_records_its_listings(self):
+        index = os.path.join(self.content, "index.md")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, os.path.join(self.root, "docs"), "/")
+        directories = listings_read(index)
+        self.assertEqual(directories, [os.path.join(self.content, "blog")])
+        self.assertIsNone(listings_read(index))
+        self.assertEqual(page_inputs(index, self.template, directories), page_inputs(index, self.template))
+
+    def test_dependents_and_explain(self):
+        graph = record_build(DependencyGraph(), self.content, self.template, os.path.join(self.root, "docs"))
+        tom = os.path.join(self.content, "blog", "tom", "index.md")
+        self.assertEqual(graph.dependents([metadata_input(tom)]), ["index.html"])
+        self.assertEqual(graph.dependents([tom]), [os.path.join("blog", "tom", "index.html")])
+        self.assertIn("index.html", graph.explain(tom))
+        self.assertIn("not in the dependency graph", graph.explain("missing.html"))
+
+    def test_save_and_load(self):
+        graph = record_build(DependencyGraph(), self.content, self.template, os.path.join(self.root, "docs"))
+        path = os.path.join(self.root, "depgraph.json")
+        graph.save(path)
+        self.assertEqual(DependencyGraph().load(path).outputs, graph.outputs)
+
+
+if __name__ == "__main__":
+    unittest.main()
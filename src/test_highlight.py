@@ -0,0 +1,65 @@
+import unittest
+import os
+import tempfile
+import highlight
+from highlight import highlight_uncached, tokenize
+from textnode import TextNode, TextType, markdown_to_html_node, split_info_string
+
+
+class TestHighlight(unittest.TestCase):
+    def tearDown(self):
+        highlight.CACHE_DIR = None
+
+    def test_python_tokens(self):
+        code = 'def f(x):  # add\n    return x + 1.5 if x else "<none>"'
+        self.assertEqual(
+            highlight_uncached(code, "python"),
+            '<span class="hl-keyword">def</span> f(x):  <span class="hl-comment"># add</span>\n'
+            '    <span class="hl-keyword">return</span> x + <span class="hl-number">1.5</span> '
+            '<span class="hl-keyword">if</span> x <span class="hl-keyword">else</span> <span class="hl-string">"&lt;none&gt;"</span>',
+        )
+
+    def test_tokens_cover_the_code(self):
+        code = "const a = `x ${b}`; // done\nlet y = 0x1f;"
+        self.assertEqual("".join(text for _, text in tokenize(code, "js")), code)
+
+    def test_unknown_language_is_only_escaped(self):
+        self.assertEqual(highlight_uncached("a < b", "cobol"), "a &lt; b")
+
+    def test_info_string(self):
+        self.assertEqual(split_info_string("```python\nx = 1\n```"), ("python", "x = 1"))
+        self.assertEqual(split_info_string("```\nx = 1\n```"), (None, "x = 1"))
+        self.assertEqual(split_info_string("```x = 1```"), (None, "x = 1"))
+
+    def test_fenced_block_is_highlighted(self):
+        textnodes = []
+        node = markdown_to_html_node("```py\nimport os\n```", textnodes=textnodes)
+        self.assertEqual(node.to_html(), '<div><pre><code class="language-py"><span class="hl-keyword">import</span> os</code></pre></div>')
+        self.assertEqual(textnodes, [TextNode("import os", TextType.CODE)])
+
+    def test_results_are_cached_on_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            highlight.CACHE_DIR = cache_dir
+            first = highlight.highlight("x = 1", "python")
+            path = highlight.cache_path("x = 1", "python")
+            self.assertTrue(os.path.exists(path))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("cached")
+            self.assertEqual(highlight.highlight("x = 1", "python"), "cached")
+            self.assertNotEqual(highlight.cache_path("x = 1", "bash"), path)
+            self.assertIn("hl-number", first)
+
+    def test_source_change_changes_cache_key(self):
+        highlight.CACHE_DIR = "cache"
+        path = highlight.cache_path("x = 1", "python")
+        version = highlight.HIGHLIGHTER_VERSION
+        self.assertEqual(version, highlight.source_version())
+        try:
+            highlight.HIGHLIGHTER_VERSION = "edited"
+            self.assertNotEqual(highlight.cache_path("x = 1", "python"), path)
+        finally:
+            highlight.HIGHLIGHTER_VERSION = version
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+from htmlnode import HTMLNode, LeafNode, ParentNode, rewrite_urls
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_single_prop(self):
@@ -63,7 +64,42 @@ class TestHTMLNode(unittest.TestCase):
         parent_node = ParentNode("div", [child_node])
         self.assertEqual(parent_node.to_html(), "<div><span><b>grandchild</b></span></div>")
 
-    
+
+    def test_render_to_writes_fragments(self):
+        class Recorder:
+            def __init__(self):
+                self.fragments = []
+            def write(self, fragment):
+                self.fragments.append(fragment)
+        node = ParentNode("p", [LeafNode(None, "Hi "), LeafNode("a", "there", {"href": "/x"})])
+        recorder = Recorder()
+        node.render_to(recorder)
+        self.assertEqual(recorder.fragments, ["<p>", "Hi ", '<a href="/x">there</a>', "</p>"])
+
+    def test_render_to_matches_to_html(self):
+        node = ParentNode("div", [ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")]), ParentNode("li", [LeafNode(None, "two")])])])
+        stream = io.StringIO()
+        node.render_to(stream)
+        self.assertEqual(stream.getvalue(), node.to_html())
+        self.assertEqual(node.to_html(), "<div><ul><li><b>one</b></li><li>two</li></ul></div>")
+
+    def test_render_to_base_node(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").render_to(io.StringIO())
+
+    def test_rewrite_urls(self):
+        node = ParentNode("p", [
+            LeafNode("a", "home", {"href": "/"}),
+            LeafNode("a", "out", {"href": "https://example.com/"}),
+            LeafNode("img", "", {"src": "/a.png", "srcset": "/a-480w.webp 480w, /a.png 640w"}),
+            LeafNode("code", 'href="/x"'),
+        ])
+        self.assertEqual(rewrite_urls(node, "/site/").to_html(),
+                         '<p><a href="/site/">home</a><a href="https://example.com/">out</a>'
+                         '<img src="/site/a.png" srcset="/site/a-480w.webp 480w, /site/a.png 640w"></img><code>href="/x"</code></p>')
+        self.assertEqual(node.children[0].props, {"href": "/"})
+        self.assertIs(rewrite_urls(node, "/"), node)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
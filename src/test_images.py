@@ -0,0 +1,71 @@
+import unittest
+import contextlib
+import io
+import os
+import struct
+from images import build_images, image_size, variant_format
+from textnode import IMAGE_ATTRIBUTES, TextNode, TextType, set_image_attributes, text_node_to_html_node
+from tempdir import TempDirTestCase
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof0
+
+
+class TestImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.cache = os.path.join(self.root, "cache")
+        self.write(os.path.join("static", "images", "a.png"), png_header(640, 480))
+        self.write(os.path.join("static", "b.jpg"), jpeg_header(320, 200))
+
+    def tearDown(self):
+        set_image_attributes({})
+
+    def build(self):
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            attributes = build_images(self.static, os.path.join(self.root, "docs"), self.cache)
+        return attributes, log.getvalue()
+
+    def test_image_size_from_headers(self):
+        self.assertEqual(image_size(os.path.join(self.static, "images", "a.png")), (640, 480))
+        self.assertEqual(image_size(os.path.join(self.static, "b.jpg")), (320, 200))
+
+    @unittest.skipIf(variant_format() is not None, "header-only images can't be resized")
+    def test_attributes_without_variants(self):
+        attributes, _ = self.build()
+        self.assertEqual(attributes["/images/a.png"], {"width": "640", "height": "480", "loading": "lazy", "decoding": "async"})
+        self.assertEqual(attributes["/b.jpg"]["width"], "320")
+
+    @unittest.skipIf(variant_format() is not None, "header-only images can't be resized")
+    def test_unchanged_images_are_cached(self):
+        self.build()
+        _, log = self.build()
+        self.assertIn("0 processed, 2 cached", log)
+        self.write(os.path.join("static", "b.jpg"), jpeg_header(321, 200))
+        _, log = self.build()
+        self.assertIn("1 processed, 1 cached", log)
+
+    def test_image_leaf_gets_attributes(self):
+        set_image_attributes({"/a.png": {"width": "10", "height": "5", "loading": "lazy"}})
+        node = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/a.png"))
+        self.assertEqual(node.to_html(), '<img src="/a.png" alt="alt" width="10" height="5" loading="lazy"></img>')
+        other = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/b.png"))
+        self.assertEqual(other.props, {"src": "/b.png", "alt": "alt"})
+
+    def test_set_image_attributes_from_itself(self):
+        # Worker initializers hand the (inherited) table back to set_image_attributes.
+        set_image_attributes({"/a.png": {"width": "10"}})
+        set_image_attributes(IMAGE_ATTRIBUTES)
+        self.assertEqual(IMAGE_ATTRIBUTES, {"/a.png": {"width": "10"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
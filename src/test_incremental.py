@@ -0,0 +1,194 @@
+import unittest
+import contextlib
+import io
+import os
+from incremental import generate_pages_incremental, hash_file, invalidate_manifest, load_manifest, save_manifest, sync_static
+from tempdir import TempDirTestCase
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css"><body>{{ Content }}</body></html>'
+
+class TestIncremental(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.graph = os.path.join(self.root, "depgraph.json")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nSome **text**")
+
+    def build(self, basepath="/"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_incremental(self.content, self.template, self.dest, basepath, self.manifest, graph_path=self.graph)
+
+    def test_first_build_renders_everything(self):
+        self.assertEqual(self.build(), (2, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post", "index.html")))
+        manifest = load_manifest(self.manifest)
+        self.assertEqual(manifest["template"], hash_file(self.template))
+
+    def test_unchanged_build_renders_nothing(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 0))
+
+    def test_only_changed_page_is_rendered(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self.assertEqual(self.build(), (1, 0))
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        self.assertEqual(self.build(), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_invalidated_manifest_rebuilds_everything(self):
+        self.build()
+        invalidate_manifest(self.manifest)
+        self.assertNotIn("pages", load_manifest(self.manifest))
+        self.assertEqual(self.build(), (2, 0))
+
+    def test_renderer_change_rebuilds_everything(self):
+        self.build()
+        manifest = load_manifest(self.manifest)
+        manifest["renderer"] = "old"
+        save_manifest(manifest, self.manifest)
+        self.assertEqual(self.build(), (2, 0))
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        self.write(self.template, TEMPLATE + "\n")
+        self.assertEqual(self.build(), (2, 0))
+
+    def test_basepath_change_rebuilds_everything(self):
+        self.build()
+        self.assertEqual(self.build("/site/"), (2, 0))
+        with open(os.path.join(self.dest, "index.html"), encoding='utf-8') as f:
+            self.assertIn('href="/site/index.css"', f.read())
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.dest, "index.html"))
+        self.assertEqual(self.build(), (1, 0))
+
+    def test_listing_renders_child_pages(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.build()
+        self.assertIn('<ul><li><a href="blog/post/">Post</a></li></ul>', self.read(os.path.join("docs", "index.html")))
+
+    def test_body_change_does_not_rebuild_listing(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nOther text")
+        self.assertEqual(self.build(), (1, 0))
+
+    def test_title_change_rebuilds_listing(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Renamed\n\nSome **text**")
+        self.assertEqual(self.build(), (2, 0))
+        self.assertIn(">Renamed</a>", self.read(os.path.join("docs", "index.html")))
+
+    def test_front_matter_change_rebuilds_listing(self):
+        post = os.path.join(self.content, "blog", "post", "index.md")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.write(post, "---\ndate: 2024-05-01\n---\n# Post")
+        self.build()
+        self.write(post, "---\ndate: 2024-06-01\n---\n# Post")
+        self.assertEqual(self.build(), (2, 0))
+        self.assertEqual(load_manifest(self.manifest)["pages"][post]["metadata"], {"date": "2024-06-01", "title": "Post"})
+
+    def test_new_page_rebuilds_listing(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages blog }}")
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.build()
+        self.write(os.path.join(self.content, "blog", "second.md"), "# Second")
+        self.assertEqual(self.build(), (2, 0))
+        self.assertIn('<a href="blog/second.html">Second</a>', self.read(os.path.join("docs", "index.html")))
+
+
+    def test_listing_of_missing_or_empty_section(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n{{ pages drafts }}")
+        self.build()
+        self.assertIn("<div><h1>Home</h1></div>", self.read(os.path.join("docs", "index.html")))
+        self.write(os.path.join(self.content, "drafts", "first.md"), "# First")
+        self.assertEqual(self.build(), (2, 0))
+        self.assertIn('<a href="drafts/first.html">First</a>', self.read(os.path.join("docs", "index.html")))
+        os.remove(os.path.join(self.content, "drafts", "first.md"))
+        self.assertEqual(self.build(), (1, 1))
+        self.assertIn("<div><h1>Home</h1></div>", self.read(os.path.join("docs", "index.html")))
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(os.path.join("static", "index.css"), "body {}")
+        self.write(os.path.join("static", "images", "a.png"), "png-bytes")
+
+    def sync(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sync_static(self.static, self.dest, self.manifest, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        self.assertEqual(self.sync(), (2, 0))
+        with open(os.path.join(self.dest, "images", "a.png"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "png-bytes")
+
+    def test_unchanged_files_are_untouched(self):
+        self.sync()
+        dest_file = os.path.join(self.dest, "index.css")
+        inode = os.stat(dest_file).st_ino
+        self.assertEqual(self.sync(), (0, 0))
+        self.assertEqual(os.stat(dest_file).st_ino, inode)
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(os.path.join("static", "index.css"), "body { margin: 0 }")
+        self.assertEqual(self.sync(), (1, 0))
+
+    def test_stale_file_is_removed(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_pages_in_destination_are_kept(self):
+        self.sync()
+        os.makedirs(self.dest, exist_ok=True)
+        page = os.path.join(self.dest, "index.html")
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write("<p>page</p>")
+        self.sync()
+        self.assertTrue(os.path.exists(page))
+
+    def test_link_mode_hardlinks(self):
+        self.sync(link=True)
+        source = os.stat(os.path.join(self.static, "index.css"))
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.css")).st_ino, source.st_ino)
+
+    def test_checksum_detects_same_size_and_mtime(self):
+        self.sync(checksum=True)
+        path = os.path.join(self.static, "index.css")
+        stat = os.stat(path)
+        self.write(os.path.join("static", "index.css"), "body []")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.sync(checksum=True), (1, 0))
+
+    def test_rewritten_output_is_not_copied_again(self):
+        self.sync()
+        with open(os.path.join(self.dest, "index.css"), 'w', encoding='utf-8') as f:
+            f.write("body{}")
+        self.assertEqual(self.sync(), (0, 0))
+
+    def test_checksum_ignores_touched_sources(self):
+        self.sync(checksum=True)
+        os.utime(os.path.join(self.static, "index.css"), ns=(0, 0))
+        self.assertEqual(self.sync(checksum=True), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
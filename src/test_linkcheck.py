@@ -0,0 +1,57 @@
+import unittest
+import contextlib
+import io
+import os
+from linkcheck import check_links, resolve, target_exists
+from textnode import LinkIndex, collect_pages, copy_static, generate_pages
+from tempdir import TempDirTestCase
+
+
+class TestResolve(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(resolve("/blog/tom", "index.html"), "blog/tom")
+        self.assertEqual(resolve("/", "blog/tom/index.html"), "")
+
+    def test_page_relative(self):
+        self.assertEqual(resolve("../majesty/", "blog/tom/index.html"), "blog/majesty")
+        self.assertEqual(resolve("second.html#top", "blog/index.html"), "blog/second.html")
+
+    def test_external_links_are_skipped(self):
+        self.assertIsNone(resolve("https://example.com/x", "index.html"))
+        self.assertIsNone(resolve("mailto:a@example.com", "index.html"))
+        self.assertIsNone(resolve("#section", "index.html"))
+
+    def test_target_exists(self):
+        paths = {"index.html", "blog/tom/index.html", "about.html", "images/a.png"}
+        for path in ("", "blog/tom", "blog/tom/", "about", "images/a.png"):
+            self.assertTrue(target_exists(path, paths), path)
+        for path in ("blog", "images/b.png", "../index.html"):
+            self.assertFalse(target_exists(path, paths), path)
+
+
+class TestCheckLinks(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.root, "static", "images", "a.png"), "png")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[Tom](/blog/tom) ![a](/images/a.png) [x](https://example.com)")
+        self.write(os.path.join(self.content, "blog", "tom", "index.md"), "# Tom\n\n[home](/) [gone](/blog/gone) ![b](/images/b.png)")
+
+    def test_reports_only_missing_targets(self):
+        copy_static(os.path.join(self.root, "static"), self.dest)
+        pages = collect_pages(self.content, self.dest)
+        link_index = LinkIndex()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages(pages, self.template, "/site/", link_index=link_index)
+        tom = os.path.join(self.content, "blog", "tom", "index.md")
+        self.assertEqual(check_links(link_index, pages, self.dest), [
+            (tom, "link", "/blog/gone"),
+            (tom, "image", "/images/b.png"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import contextlib
+import gzip
+import io
+import os
+from minify import minify_css, minify_html, optimize_output
+from tempdir import TempDirTestCase
+
+
+class TestMinify(unittest.TestCase):
+    def test_html_whitespace_and_comments(self):
+        html = "<html>\n  <body>\n    <!-- note -->\n    <p>Some   <b>bold</b>\n text</p>\n  </body>\n</html>"
+        self.assertEqual(minify_html(html), "<html><body><p>Some <b>bold</b> text</p></body></html>")
+
+    def test_pre_and_code_are_untouched(self):
+        html = "<div>\n<pre><code>def f():\n    return  1\n</code></pre>\n<p>a  <code>x  y</code></p></div>"
+        self.assertEqual(minify_html(html), "<div><pre><code>def f():\n    return  1\n</code></pre><p>a <code>x  y</code></p></div>")
+
+    def test_css(self):
+        css = "/* c */\nbody {\n  font-family: \"A  B\", serif;\n  margin: 0;\n}\n\na:hover ,\nb > i {\n  color: red;\n}\n"
+        self.assertEqual(minify_css(css), 'body{font-family:"A  B",serif;margin:0}a:hover,b>i{color:red}')
+
+
+class TestOptimizeOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest = os.path.join(self.root, "manifest.json")
+        self.write(os.path.join("docs", "index.html"), "<html>\n  <body>\n    <p>Hi</p>\n  </body>\n</html>")
+        self.write(os.path.join("docs", "index.css"), "body {\n  margin: 0;\n}\n")
+
+    def optimize(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return optimize_output(self.dest, self.manifest)
+
+    def test_minifies_and_precompresses(self):
+        self.assertEqual(self.optimize(), 2)
+        with open(os.path.join(self.dest, "index.html"), 'rb') as f:
+            html = f.read()
+        self.assertEqual(html, b"<html><body><p>Hi</p></body></html>")
+        with gzip.open(os.path.join(self.dest, "index.html.gz")) as f:
+            self.assertEqual(f.read(), html)
+
+    def test_unchanged_files_are_skipped(self):
+        self.optimize()
+        self.assertEqual(self.optimize(), 0)
+        self.write(os.path.join("docs", "index.html"), "<p>\n  New\n</p>")
+        self.assertEqual(self.optimize(), 1)
+
+    def test_stale_siblings_are_removed(self):
+        self.optimize()
+        os.remove(os.path.join(self.dest, "index.css"))
+        self.optimize()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css.gz")))
+
+    def test_hardlinked_output_is_not_modified(self):
+        original = os.path.join(self.root, "previous.html")
+        os.link(os.path.join(self.dest, "index.html"), original)
+        self.optimize()
+        with open(original, encoding='utf-8') as f:
+            self.assertIn("\n", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
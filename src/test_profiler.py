@@ -0,0 +1,73 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import textnode
+from htmlnode import LeafNode
+from profiler import STAGES, Profiler
+from textnode import collect_page_variants, generate_page_variants, generate_pages_recursive
+from tempdir import TempDirTestCase
+
+class TestProfiler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join("content", "index.md"), "# Home\n\nHello **world**")
+        self.write(os.path.join("content", "post", "index.md"), "# Post\n\n- [a](/a)\n- b")
+
+    def build(self, profiler):
+        with profiler.installed(), contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(os.path.join(self.root, "content"), self.template, os.path.join(self.root, "docs"), "/")
+
+    def test_stages_are_recorded_per_page(self):
+        profiler = Profiler()
+        self.build(profiler)
+        self.assertEqual(len(profiler.pages), 2)
+        for stats in profiler.pages.values():
+            self.assertGreater(stats["seconds"], 0)
+            self.assertTrue({"read", "markdown_to_blocks", "text_to_textnodes", "to_html", "template", "write"} <= set(stats["stages"]))
+        self.assertEqual(tuple(profiler.aggregate()), STAGES)
+
+    def test_variants_are_recorded_per_page(self):
+        profiler = Profiler()
+        variants = [("/", os.path.join(self.root, "a")), ("/b/", os.path.join(self.root, "b"))]
+        with profiler.installed(), contextlib.redirect_stdout(io.StringIO()):
+            generate_page_variants(collect_page_variants(os.path.join(self.root, "content"), variants), self.template)
+        self.assertEqual(len(profiler.pages), 2)
+        self.assertNotIn(None, profiler.pages)
+        self.assertIn("slowest pages", profiler.table())
+
+    def test_work_outside_pages_is_not_recorded(self):
+        profiler = Profiler()
+        with profiler.installed():
+            textnode.page_metadata(os.path.join(self.root, "content", "index.md"))
+        self.assertEqual(profiler.pages, {})
+        self.assertIn("slowest pages", profiler.table())
+
+    def test_patches_are_removed(self):
+        render_page_file = textnode.render_page_file
+        render_to = LeafNode.render_to
+        self.build(Profiler())
+        self.assertIs(textnode.render_page_file, render_page_file)
+        self.assertIs(LeafNode.render_to, render_to)
+
+    def test_output_is_unchanged(self):
+        self.build(Profiler())
+        self.assertEqual(self.read(os.path.join("docs", "post", "index.html")), '<title>Post</title><div><h1>Post</h1><ul><li><a href="/a">a</a></li><li>b</li></ul></div>')
+
+    def test_report_and_table(self):
+        profiler = Profiler()
+        self.build(profiler)
+        path = os.path.join(self.root, "profile.json")
+        profiler.save(path)
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        self.assertEqual(set(report), {"pages", "aggregate", "total_seconds"})
+        table = profiler.table(top=1)
+        self.assertIn("slowest pages", table)
+        self.assertEqual(sum(1 for line in table.splitlines() if "index.md" in line), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
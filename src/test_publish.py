@@ -0,0 +1,126 @@
+import unittest
+import contextlib
+import io
+import os
+from publish import list_builds, materialize, rollback, staged_build
+from textnode import copy_static
+from tempdir import TempDirTestCase
+
+class TestStagedBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.root, "docs")
+
+    def publish(self, files, keep=2):
+        def build(staging):
+            for name, text in files.items():
+                path = os.path.join(staging, name)
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        if f.read() == text:
+                            continue
+                    os.remove(path)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return staged_build(self.dest, build, keep)
+
+    def test_publish_flips_symlink(self):
+        first = self.publish({"index.html": "one"})
+        self.assertTrue(os.path.islink(self.dest))
+        self.assertEqual(os.path.realpath(self.dest), first)
+        second = self.publish({"index.html": "two"})
+        self.assertEqual(os.path.realpath(self.dest), second)
+        self.assertEqual(self.read(os.path.join("docs", "index.html")), "two")
+
+    def test_unchanged_files_are_hardlinked(self):
+        first = self.publish({"a.html": "same", "b.html": "old"})
+        second = self.publish({"a.html": "same", "b.html": "new"})
+        self.assertEqual(os.stat(os.path.join(first, "a.html")).st_ino, os.stat(os.path.join(second, "a.html")).st_ino)
+        with open(os.path.join(first, "b.html"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "old")
+
+    def test_plain_directory_is_moved_aside(self):
+        os.makedirs(self.dest)
+        with open(os.path.join(self.dest, "index.html"), 'w', encoding='utf-8') as f:
+            f.write("legacy")
+        self.publish({"index.html": "new"})
+        self.assertEqual(len(list_builds(self.dest)), 2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rollback(self.dest)
+        self.assertEqual(self.read(os.path.join("docs", "index.html")), "legacy")
+
+    def test_old_builds_are_pruned(self):
+        for i in range(5):
+            self.publish({"index.html": str(i)}, keep=2)
+        self.assertEqual(len(list_builds(self.dest)), 3)
+
+    def test_rollback(self):
+        self.publish({"index.html": "one"})
+        self.publish({"index.html": "two"})
+        with contextlib.redirect_stdout(io.StringIO()):
+            rollback(self.dest)
+        self.assertEqual(self.read(os.path.join("docs", "index.html")), "one")
+        with self.assertRaises(Exception):
+            rollback(self.dest)
+
+    def test_materialize_replaces_symlink(self):
+        live = self.publish({"index.html": "one"})
+        self.assertTrue(materialize(self.dest))
+        self.assertFalse(os.path.islink(self.dest))
+        self.assertEqual(self.read(os.path.join("docs", "index.html")), "one")
+        self.assertEqual(os.stat(os.path.join(live, "index.html")).st_ino, os.stat(os.path.join(self.dest, "index.html")).st_ino)
+        self.assertFalse(materialize(self.dest))
+
+    def test_copy_static_replaces_symlink(self):
+        live = self.publish({"index.html": "one"})
+        static = os.path.join(self.root, "static")
+        os.makedirs(static)
+        copy_static(static, self.dest)
+        self.assertFalse(os.path.islink(self.dest))
+        self.assertTrue(os.path.exists(os.path.join(live, "index.html")))
+
+    def test_failed_build_keeps_live_site(self):
+        live = self.publish({"index.html": "one"})
+        def broken(staging):
+            raise RuntimeError("boom")
+        with self.assertRaises(RuntimeError):
+            staged_build(self.dest, broken)
+        self.assertEqual(os.path.realpath(self.dest), live)
+        self.assertEqual(list_builds(self.dest), [live])
+
+    def test_failed_build_restores_state(self):
+        manifest = self.write("manifest.json", "one")
+        self.publish({"index.html": "one"})
+        def broken(staging):
+            self.write("manifest.json", "broken")
+            raise RuntimeError("boom")
+        with self.assertRaises(RuntimeError):
+            staged_build(self.dest, broken, state_paths=[manifest])
+        self.assertEqual(self.read("manifest.json"), "one")
+
+    def test_rollback_restores_state(self):
+        manifest = self.path("manifest.json")
+        def build(text):
+            def write(staging):
+                self.write(os.path.join(staging, "index.html"), text)
+                self.write("manifest.json", text)
+            with contextlib.redirect_stdout(io.StringIO()):
+                staged_build(self.dest, write, state_paths=[manifest])
+        build("one")
+        build("two")
+        with contextlib.redirect_stdout(io.StringIO()):
+            rollback(self.dest, [manifest])
+        self.assertEqual(self.read("manifest.json"), "one")
+
+    def test_rollback_without_saved_state_removes_it(self):
+        self.publish({"index.html": "one"})
+        self.publish({"index.html": "two"})
+        manifest = self.write("manifest.json", "two")
+        with contextlib.redirect_stdout(io.StringIO()):
+            rollback(self.dest, [manifest])
+        self.assertFalse(os.path.exists(manifest))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import contextlib
+import io
+import os
+import time
+from serve import DevSite, PollingWatcher, ReloadHub
+from incremental import load_manifest, save_manifest
+from tempdir import TempDirTestCase
+
+class TestDevSite(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(self.path("template.html"), "<title>{{ Title }}</title>{{ Content }}")
+        self.write(self.path("content", "index.md"), "# Home\n\nHello")
+        self.write(self.path("static", "index.css"), "body {}")
+        self.site = DevSite(self.path("content"), self.path("static"), self.path("template.html"), self.path("docs"), "/",
+                            manifest_path=self.path("manifest.json"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.site.build_all()
+
+    def apply(self, *paths):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.site.apply(set(paths))
+
+    def test_changed_page_is_rendered(self):
+        self.write(self.path("content", "index.md"), "# Home\n\nChanged")
+        self.assertEqual(self.apply(self.path("content", "index.md")), 1)
+        self.assertIn("Changed", self.read(self.path("docs", "index.html")))
+
+    def test_new_and_deleted_page(self):
+        new_page = self.path("content", "blog", "index.md")
+        self.write(new_page, "# Blog\n\nPosts")
+        self.apply(new_page)
+        self.assertTrue(os.path.exists(self.path("docs", "blog", "index.html")))
+        os.remove(new_page)
+        self.apply(new_page)
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "index.html")))
+
+    def test_rebuild_invalidates_manifest(self):
+        save_manifest({"pages": {"index.md": {}}, "static": {}, "renderer": "1"}, self.path("manifest.json"))
+        self.write(self.path("content", "index.md"), "# Home\n\nChanged")
+        self.apply(self.path("content", "index.md"))
+        self.assertEqual(load_manifest(self.path("manifest.json")), {"renderer": "1"})
+
+    def test_static_file_is_copied(self):
+        self.write(self.path("static", "index.css"), "body { color: red }")
+        self.apply(self.path("static", "index.css"))
+        self.assertEqual(self.read(self.path("docs", "index.css")), "body { color: red }")
+
+    def test_template_change_rerenders_all_pages(self):
+        self.write(self.path("template.html"), "<h1>{{ Title }}</h1>{{ Content }}")
+        self.apply(self.path("template.html"))
+        self.assertTrue(self.read(self.path("docs", "index.html")).startswith("<h1>Home</h1>"))
+
+    def test_broken_page_does_not_stop_template_rebuild(self):
+        self.write(self.path("content", "a.md"), "No title")
+        self.write(self.path("content", "b.md"), "# B")
+        self.apply(self.path("content", "a.md"), self.path("content", "b.md"))
+        self.write(self.path("template.html"), "<h1>{{ Title }}</h1>{{ Content }}")
+        self.apply(self.path("template.html"))
+        self.assertTrue(self.read(self.path("docs", "b.html")).startswith("<h1>B</h1>"))
+
+    def test_title_change_rerenders_listing(self):
+        post = self.path("content", "blog", "post.md")
+        self.write(post, "# Post")
+        self.write(self.path("content", "index.md"), "# Home\n\n{{ pages blog }}")
+        self.assertEqual(self.apply(post, self.path("content", "index.md")), 2)
+        self.assertIn(">Post</a>", self.read(self.path("docs", "index.html")))
+        self.write(post, "# Renamed\n\nBody")
+        self.assertEqual(self.apply(post), 2)
+        self.assertIn(">Renamed</a>", self.read(self.path("docs", "index.html")))
+        self.write(post, "# Renamed\n\nOther body")
+        self.assertEqual(self.apply(post), 1)
+
+    def test_polling_watcher_reports_changes(self):
+        watcher = PollingWatcher([self.path("content")], interval=0.01)
+        time.sleep(0.01)
+        self.write(self.path("content", "new.md"), "# New")
+        self.assertIn(self.path("content", "new.md"), watcher.wait())
+
+    def test_reload_hub_wakes_waiters(self):
+        hub = ReloadHub()
+        hub.push()
+        self.assertEqual(hub.wait(0, timeout=0), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+from siteindex import SiteIndex, decode_terms, encode_terms, page_updated, search, write_site_files
+from textnode import collect_pages, generate_pages
+from incremental import generate_pages_incremental
+from tempdir import TempDirTestCase
+
+
+class TestSearchIndexEncoding(unittest.TestCase):
+    def test_front_coding_round_trip(self):
+        terms = ["bomb", "bombadil", "bombs", "tom", "tolkien"]
+        encoded = encode_terms(sorted(terms))
+        self.assertEqual(encoded[:4], [0, "bomb", 4, "adil"])
+        self.assertEqual(decode_terms(encoded), sorted(terms))
+
+
+class TestPageUpdated(TempDirTestCase):
+    def test_dates_are_rfc3339(self):
+        path = self.write("page.md", "# Page")
+        self.assertEqual(page_updated(path, {"date": "2024-05-01"}), "2024-05-01T00:00:00Z")
+        self.assertEqual(page_updated(path, {"date": "2024-05-01T10:30:00+02:00"}), "2024-05-01T10:30:00+02:00")
+        self.assertRegex(page_updated(path, {"date": "May 1 <2024>"}), r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$")
+
+class TestSiteFiles(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to the *fan club*")
+        self.write(os.path.join(self.content, "blog", "tom", "index.md"), "---\ndate: 2024-05-01\n---\n# Tom & Co\n\nOld Tom Bombadil")
+        self.write(os.path.join(self.content, "blog", "elves.md"), "---\ndate: 2024-06-01\n---\n# Elves\n\nGlorfindel and Legolas")
+
+    def build(self, jobs=1):
+        pages = collect_pages(self.content, self.dest)
+        site_index = SiteIndex()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages(pages, self.template, "/site/", jobs, link_index=site_index)
+            write_site_files(site_index, pages, self.content, self.dest, "https://example.com/", "/site/")
+        return site_index
+
+    def test_sitemap_lists_every_page(self):
+        self.build()
+        sitemap = self.read(os.path.join("docs", "sitemap.xml"))
+        for url in ("https://example.com/site/", "https://example.com/site/blog/elves.html", "https://example.com/site/blog/tom/"):
+            self.assertIn(f"<loc>{url}</loc>", sitemap)
+        self.assertIn("<lastmod>2024-05-01T00:00:00Z</lastmod>", sitemap)
+
+    def test_feed_has_newest_blog_posts_first(self):
+        self.build()
+        feed = self.read(os.path.join("docs", "feed.xml"))
+        self.assertIn("<title>Home</title>", feed)
+        self.assertLess(feed.index("<title>Elves</title>"), feed.index("<title>Tom &amp; Co</title>"))
+        self.assertEqual(feed.count("<entry>"), 2)
+        self.assertIn("<author><name>Home</name></author>", feed)
+
+    def test_feed_author_from_option(self):
+        pages = collect_pages(self.content, self.dest)
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_site_files(SiteIndex(), pages, self.content, self.dest, "https://example.com/", "/site/", feed_author="Tom & Co")
+        self.assertIn("<author><name>Tom &amp; Co</name></author>", self.read(os.path.join("docs", "feed.xml")))
+
+    def test_search_index(self):
+        self.build(jobs=2)
+        index = json.loads(self.read(os.path.join("docs", "search.json")))
+        self.assertEqual(search(index, "Bombadil"), ["/site/blog/tom/"])
+        self.assertEqual(search(index, "fan club"), ["/site/"])
+        self.assertEqual(search(index, "tom legolas"), [])
+
+    def test_incremental_build_keeps_terms_of_unchanged_pages(self):
+        manifest = os.path.join(self.root, "manifest.json")
+        graph = os.path.join(self.root, "depgraph.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.dest, "/", manifest, graph_path=graph, link_index=SiteIndex())
+            site_index = SiteIndex()
+            generate_pages_incremental(self.content, self.template, self.dest, "/", manifest, graph_path=graph, link_index=site_index)
+        self.assertIn("bombadil", site_index.terms[os.path.join(self.content, "blog", "tom", "index.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
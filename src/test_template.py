@@ -0,0 +1,50 @@
+import unittest
+import io
+import os
+import tempfile
+from template import Template, load_template, rewrite_basepath
+
+class TestTemplate(unittest.TestCase):
+    def test_segments(self):
+        template = Template("<title>{{ Title }}</title>{{Content}}!")
+        self.assertEqual(template.segments, ["<title>", "Title", "</title>", "Content", "!"])
+        self.assertEqual(template.placeholders, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1><p>{{ Date }}</p>{{ Content }}")
+        html = template.render({"Title": "Tom", "Date": "2024-01-01", "Content": "<p>x</p>"})
+        self.assertEqual(html, "<h1>Tom</h1><p>2024-01-01</p><p>x</p>")
+
+    def test_render_missing_placeholder_is_empty(self):
+        template = Template("<meta content=\"{{ Description }}\">")
+        self.assertEqual(template.render({}), '<meta content="">')
+
+    def test_basepath_applied_to_literals_only(self):
+        template = Template('<link href="/index.css"><img src="/a.png">{{ Content }}', "/site/")
+        html = template.render({"Content": '<a href="/x">'})
+        self.assertEqual(html, '<link href="/site/index.css"><img src="/site/a.png"><a href="/x">')
+
+    def test_render_to_with_content_callback(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        stream = io.StringIO()
+        template.render_to(stream, {"Title": "T"}, lambda s: s.write("<p>body</p>"))
+        self.assertEqual(stream.getvalue(), "<title>T</title><main><p>body</p></main>")
+
+    def test_rewrite_basepath(self):
+        self.assertEqual(rewrite_basepath('<a href="/a">', "/b/"), '<a href="/b/a">')
+
+    def test_load_template_is_cached(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("{{ Title }}")
+            first = load_template(path, "/")
+            self.assertIs(first, load_template(path, "/"))
+            self.assertIsNot(first, load_template(path, "/other/"))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("<b>{{ Title }}</b>")
+            self.assertEqual(load_template(path, "/").render({"Title": "x"}), "<b>x</b>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
 import unittest
 from textnode import TextNode, TextType, BlockType, text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, block_to_block_type, text_to_children, markdown_to_html_node, extract_title
+from textnode import collect_pages, collect_page_variants, generate_pages, generate_page_variants, iter_blocks, stream_markdown_html, scan_title, extract_link_spans, LinkIndex
+from textnode import scan_front_matter, scan_metadata, skip_front_matter, render_page
+from textnode import BlockHandler, register_block_handler, unregister_block_handler, block_to_html_node
+from template import Template
 from htmlnode import HTMLNode, LeafNode, ParentNode
+import contextlib
+import io
+import os
+from tempdir import TempDirTestCase
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -307,6 +315,39 @@ class TestTextNode(unittest.TestCase):
         )
         
         
+    def test_extract_link_spans_offsets(self):
+        text = "see ![img](/a.png) and [link](/b)"
+        spans = extract_link_spans(text)
+        self.assertEqual(spans, [
+            (4, 18, TextType.IMAGE, "img", "/a.png"),
+            (23, 33, TextType.LINK, "link", "/b"),
+        ])
+        self.assertEqual(text[spans[1][0]:spans[1][1]], "[link](/b)")
+
+    def test_text_to_textnodes_plain_text(self):
+        self.assertListEqual([TextNode("Just words", TextType.TEXT)], text_to_textnodes("Just words"))
+
+    def test_text_to_textnodes_underscore_in_url(self):
+        nodes = text_to_textnodes("Read [the docs](https://example.com/a_b_c) now")
+        self.assertListEqual(
+            [
+                TextNode("Read ", TextType.TEXT),
+                TextNode("the docs", TextType.LINK, "https://example.com/a_b_c"),
+                TextNode(" now", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[l{i}](/p{i})" for i in range(50))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(99, len(nodes))
+        self.assertEqual(TextNode("l49", TextType.LINK, "/p49"), nodes[-1])
+
+    def test_text_to_textnodes_missing_closing_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **bold and _italic_")
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -363,6 +404,65 @@ This is the same paragraph on a new line
         result = markdown_to_blocks(markdown)
         self.assertEqual(result, expected)
 
+    def test_markdown_to_blocks_fenced_code_with_blank_lines(self):
+        markdown = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        expected = ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"]
+        self.assertEqual(markdown_to_blocks(markdown), expected)
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "First block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(iter_blocks(lines())), "First block")
+
+    def test_stream_markdown_html_matches_node_tree(self):
+        markdown = "# Title\n\nSome **text**\n\n```\ncode\n\nmore\n```\n\n- a\n- b\n"
+        stream = io.StringIO()
+        stream_markdown_html(io.StringIO(markdown), stream)
+        self.assertEqual(stream.getvalue(), markdown_to_html_node(markdown).to_html())
+        self.assertIn("<pre><code>code\n\nmore</code></pre>", stream.getvalue())
+
+    def test_scan_title_stops_at_title(self):
+        def lines():
+            yield "intro\n"
+            yield "# The Title\n"
+            raise AssertionError("read past the title")
+        self.assertEqual(scan_title(lines()), "The Title")
+
+    def test_scan_front_matter_yaml(self):
+        lines = ["---", "title: Tom", "date: 2024-05-01", "tags: [lotr, 'tom']", "---", "# Heading"]
+        self.assertEqual(scan_front_matter(lines), {"title": "Tom", "date": "2024-05-01", "tags": ["lotr", "tom"]})
+
+    def test_scan_front_matter_toml(self):
+        lines = ["+++", 'title = "Tom: a mistake"', "draft = false", "+++"]
+        self.assertEqual(scan_front_matter(lines), {"title": "Tom: a mistake", "draft": "false"})
+
+    def test_scan_front_matter_errors(self):
+        self.assertEqual(scan_front_matter(["# Title"]), {})
+        with self.assertRaises(Exception):
+            scan_front_matter(["---", "title: Tom"])
+        with self.assertRaises(Exception):
+            scan_front_matter(["---", "no separator", "---"])
+
+    def test_scan_metadata_reads_only_the_head(self):
+        def lines(title_in_front_matter):
+            yield "---\n"
+            yield "date: 2024-05-01\n"
+            if title_in_front_matter:
+                yield "title: From front matter\n"
+            yield "---\n"
+            yield "# From heading\n"
+            raise AssertionError("read past the metadata")
+        self.assertEqual(scan_metadata(lines(True)), {"date": "2024-05-01", "title": "From front matter"})
+        self.assertEqual(scan_metadata(lines(False)), {"date": "2024-05-01", "title": "From heading"})
+
+    def test_front_matter_is_not_rendered(self):
+        markdown = "---\ndate: 2024-05-01\n---\n# Post\n\nBody"
+        self.assertEqual(list(skip_front_matter(markdown.split("\n"))), ["# Post", "", "Body"])
+        template = Template("<title>{{ Title }}</title><time>{{ Date }}</time>{{ Content }}")
+        self.assertEqual(render_page(markdown, template, "/"), "<title>Post</title><time>2024-05-01</time><div><h1>Post</h1><p>Body</p></div>")
+
     def test_block_to_block_type_heading(self):
         markdown_block = "###### Heading"
         result = block_to_block_type(markdown_block)
@@ -398,6 +498,27 @@ This is the same paragraph on a new line
         result = block_to_block_type(markdown_block)
         self.assertEqual(result, BlockType.PARAGRAPH)
 
+    def test_registered_block_handler(self):
+        def render_note(block, textnodes=None):
+            return ParentNode("aside", text_to_children(block.removeprefix("!!! note").strip(), textnodes))
+        handler = register_block_handler("!", BlockHandler("note", lambda block: block.startswith("!!! note"), render_note))
+        try:
+            self.assertEqual(block_to_block_type("!!! note Mind the **Ring**"), "note")
+            self.assertEqual(block_to_html_node("!!! note Mind the **Ring**").to_html(), "<aside>Mind the <b>Ring</b></aside>")
+            self.assertEqual(block_to_block_type("!!! warning"), BlockType.PARAGRAPH)
+            self.assertEqual(block_to_block_type("# Title"), BlockType.HEADING)
+        finally:
+            unregister_block_handler(handler)
+        self.assertEqual(block_to_block_type("!!! note Mind the Ring"), BlockType.PARAGRAPH)
+
+    def test_handler_registered_before_builtin(self):
+        handler = register_block_handler("#", BlockHandler("tag", lambda block: block.startswith("#tag"), lambda block, textnodes=None: LeafNode("span", block)), before=True)
+        try:
+            self.assertEqual(block_to_block_type("#tag"), "tag")
+            self.assertEqual(block_to_block_type("# Title"), BlockType.HEADING)
+        finally:
+            unregister_block_handler(handler)
+
     def test_paragraphs(self):
         md = """
     This is **bolded** paragraph
@@ -456,5 +577,59 @@ def test_extract_title_empty_string(self):
     with self.assertRaises(Exception):
         extract_title(markdown)
 
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+        for i in range(6):
+            self.write(os.path.join("content", f"post{i}", "index.md"), f"# Post {i}\n\nText with a [link](/post{i}) and **bold**")
+
+    def build(self, dest, jobs, link_index=None):
+        pages = collect_pages(os.path.join(self.root, "content"), os.path.join(self.root, dest))
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            generate_pages(pages, self.template, "/base/", jobs, link_index=link_index)
+        return pages, log.getvalue()
+
+    def test_parallel_output_matches_serial(self):
+        serial_pages, serial_log = self.build("serial", 1)
+        parallel_pages, parallel_log = self.build("parallel", 2)
+        self.assertEqual(serial_log.replace("serial", "parallel"), parallel_log)
+        for (_, serial_dest), (_, parallel_dest) in zip(serial_pages, parallel_pages):
+            with open(serial_dest, 'rb') as a, open(parallel_dest, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_parallel_reports_failing_pages(self):
+        self.write(os.path.join("content", "broken", "index.md"), "No title here")
+        with self.assertRaises(Exception) as ctx:
+            self.build("parallel", 2)
+        self.assertIn("broken", str(ctx.exception))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "parallel", "post5", "index.html")))
+
+    def test_link_index_matches_serial_and_parallel(self):
+        serial, parallel = LinkIndex(), LinkIndex()
+        self.build("serial", 1, serial)
+        self.build("parallel", 2, parallel)
+        self.assertEqual(serial.pages, parallel.pages)
+        post = os.path.join(self.root, "content", "post3", "index.md")
+        self.assertEqual(serial.pages[post], [("link", "/post3", "link")])
+        self.assertEqual(serial.pages_linking_to("/post3"), [post])
+
+    def test_variants_match_single_builds(self):
+        self.build("single", 1)
+        variants = [("/base/", os.path.join(self.root, "base")), ("/", os.path.join(self.root, "root"))]
+        for jobs in (1, 2):
+            link_index = LinkIndex()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_page_variants(collect_page_variants(os.path.join(self.root, "content"), variants), self.template, jobs, link_index=link_index)
+            for from_path, dest_path in collect_pages(os.path.join(self.root, "content"), os.path.join(self.root, "single")):
+                with open(dest_path, 'rb') as f:
+                    expected = f.read()
+                with open(dest_path.replace("single", "base"), 'rb') as f:
+                    self.assertEqual(f.read(), expected)
+                with open(dest_path.replace("single", "root"), 'rb') as f:
+                    self.assertEqual(f.read(), expected.replace(b"/base/", b"/"))
+            self.assertEqual(len(link_index.pages), 6)
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,9 +1,16 @@
 from enum import Enum
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, rewrite_urls
+from template import load_template
+from atomicwrite import open_atomic
+import highlight
+import io
+import itertools
+import json
 import re
 import textwrap
 import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 
 class TextType(Enum):
     TEXT = "text"
@@ -15,6 +22,8 @@ class TextType(Enum):
 
         
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text                # The text content of the node
         self.text_type = text_type      # The type of text this node contains, which is a member of the TextType enum.
@@ -31,22 +40,39 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
+TEXT_TYPE_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: 'b',
+    TextType.ITALIC: 'i',
+    TextType.CODE: 'code',
+    TextType.LINK: 'a',
+    TextType.IMAGE: 'img',
+}
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Extra <img> attributes by image URL (width, height, srcset, ...), filled in by the image stage.
+IMAGE_ATTRIBUTES = {}
+
+def set_image_attributes(attributes):
+    attributes = dict(attributes)
+    IMAGE_ATTRIBUTES.clear()
+    IMAGE_ATTRIBUTES.update(attributes)
+
 def text_node_to_html_node(text_node):
-    valid_types = [TextType.TEXT, TextType.BOLD, TextType.ITALIC, TextType.CODE, TextType.LINK, TextType.IMAGE]
-    if text_node.text_type not in valid_types:
+    try:
+        tag = TEXT_TYPE_TAGS[text_node.text_type]
+    except (KeyError, TypeError):
         raise Exception("Unknown text type")
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text, None)
-    if text_node.text_type == TextType.BOLD:
-        return LeafNode('b', text_node.text, None)
-    if text_node.text_type == TextType.ITALIC:
-        return LeafNode('i', text_node.text, None)
-    if text_node.text_type == TextType.CODE:
-        return LeafNode('code', text_node.text, None)
-    if text_node.text_type == TextType.LINK:
-        return LeafNode('a', text_node.text, {'href': text_node.url})
-    if text_node.text_type == TextType.IMAGE:
-        return LeafNode('img', '', {'src': text_node.url, 'alt': text_node.text})    
+    if text_node.text_type is TextType.LINK:
+        return LeafNode(tag, text_node.text, {'href': text_node.url})
+    if text_node.text_type is TextType.IMAGE:
+        props = {'src': text_node.url, 'alt': text_node.text}
+        extra = IMAGE_ATTRIBUTES.get(text_node.url)
+        if extra:
+            props.update(extra)
+        return LeafNode(tag, '', props)
+    return LeafNode(tag, text_node.text)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     result = []
@@ -67,73 +93,110 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             result.append(node)
     return result
 
+IMAGE_SOURCE = r"!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+LINK_SOURCE = r"\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\)"
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_SPAN_PATTERN = re.compile(IMAGE_SOURCE + "|" + LINK_SOURCE)
+INLINE_PATTERN = re.compile(
+    r"(?=[!\[*_`])"
+    r"(?:" + IMAGE_SOURCE + "|" + LINK_SOURCE +
+    r"|\*\*(?P<bold>.*?)\*\*"
+    r"|_(?P<italic>.*?)_"
+    r"|`(?P<code>.*?)`"
+    r"|(?P<unclosed>\*\*|_|`))",
+    re.DOTALL,
+)
+
 def extract_markdown_images(text):
-    images = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return images
+    return IMAGE_PATTERN.findall(text)
 
 def extract_markdown_links(text):
-    links = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
-    return links
+    return LINK_PATTERN.findall(text)
 
-def split_nodes_image(old_nodes):
-    result = []
-    for node in old_nodes:
-        if node.text_type == TextType.TEXT:
-            current_text_to_process = node.text
-            while len(extract_markdown_images(current_text_to_process)) > 0:
-                images = extract_markdown_images(current_text_to_process)
-                image_first = images[0]
-                full_markdown_image = f"![{image_first[0]}]({image_first[1]})"
-                texts = current_text_to_process.split(full_markdown_image, 1)
-                text_before_image = texts[0]
-                if text_before_image:
-                    result.append(TextNode(text_before_image, TextType.TEXT))
-                result.append(TextNode(image_first[0], TextType.IMAGE, image_first[1]))
-                current_text_to_process = texts[1]
-            if current_text_to_process:
-                result.append(TextNode(current_text_to_process, TextType.TEXT))
+def extract_link_spans(text):
+    """All images and links in text as (start, end, text_type, text, url), found in one pass."""
+    spans = []
+    for match in LINK_SPAN_PATTERN.finditer(text):
+        if match.lastgroup == "image_url":
+            spans.append((match.start(), match.end(), TextType.IMAGE, match.group("image_alt"), match.group("image_url")))
         else:
-            result.append(node)
-    return result                       
-        
-def split_nodes_link(old_nodes):
+            spans.append((match.start(), match.end(), TextType.LINK, match.group("link_text"), match.group("link_url")))
+    return spans
+
+def split_nodes_by_spans(old_nodes, text_type):
     result = []
     for node in old_nodes:
-        if node.text_type == TextType.TEXT:
-            current_text_to_process = node.text
-            while len(extract_markdown_links(current_text_to_process)) > 0:
-                links = extract_markdown_links(current_text_to_process)
-                link_first = links[0]
-                full_markdown_link = f"[{link_first[0]}]({link_first[1]})"
-                texts = current_text_to_process.split(full_markdown_link, 1)
-                text_before_link = texts[0]
-                if text_before_link:
-                    result.append(TextNode(text_before_link, TextType.TEXT))
-                result.append(TextNode(link_first[0], TextType.LINK, link_first[1]))
-                current_text_to_process = texts[1]
-            if current_text_to_process:
-                result.append(TextNode(current_text_to_process, TextType.TEXT))
-        else:
+        if node.text_type != TextType.TEXT:
             result.append(node)
+            continue
+        # Slice around the recorded offsets instead of searching the remaining text again.
+        position = 0
+        for start, end, span_type, text, url in extract_link_spans(node.text):
+            if span_type != text_type:
+                continue
+            if start > position:
+                result.append(TextNode(node.text[position:start], TextType.TEXT))
+            result.append(TextNode(text, span_type, url))
+            position = end
+        if position < len(node.text):
+            result.append(TextNode(node.text[position:], TextType.TEXT))
     return result
 
+def split_nodes_image(old_nodes):
+    return split_nodes_by_spans(old_nodes, TextType.IMAGE)
+
+def split_nodes_link(old_nodes):
+    return split_nodes_by_spans(old_nodes, TextType.LINK)
+
+DELIMITED_TYPES = {"bold": TextType.BOLD, "italic": TextType.ITALIC, "code": TextType.CODE}
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    # One left-to-right scan: every match is the earliest image, link or delimited span,
+    # so the text between matches is plain and nothing is ever searched twice.
+    nodes = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "unclosed":
+            raise Exception('closing delimiter missing')
+        if match.start() > position:
+            nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
+        position = match.end()
+        if kind == "image_url":
+            nodes.append(TextNode(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+        elif kind == "link_url":
+            nodes.append(TextNode(match.group("link_text"), TextType.LINK, match.group("link_url")))
+        elif match.group(kind):
+            nodes.append(TextNode(match.group(kind), DELIMITED_TYPES[kind]))
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
     return nodes
 
+def iter_blocks(lines):
+    # Blank lines end a block, except inside a fenced code block.
+    block_lines = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if stripped.startswith("```") and not (len(stripped) >= 6 and stripped.endswith("```") and not in_fence):
+            in_fence = not in_fence
+        if not stripped and not in_fence:
+            if block_lines:
+                block = "\n".join(block_lines).strip()
+                block_lines = []
+                if block:
+                    yield block
+            continue
+        block_lines.append(line)
+    block = "\n".join(block_lines).strip()
+    if block:
+        yield block
+
 def markdown_to_blocks(markdown):
-    blocks = markdown.split("\n\n")
-    cleaned_blocks = []
-    for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:
-             cleaned_blocks.append(stripped_block)
-    return cleaned_blocks 
+    return list(iter_blocks(markdown.split("\n")))
 
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
@@ -143,124 +206,322 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+class BlockHandler:
+    """One kind of markdown block: detect(block) says whether a block is of this kind,
+    render(block, textnodes) builds its HTML node."""
+    __slots__ = ("block_type", "detect", "render")
+
+    def __init__(self, block_type, detect, render):
+        self.block_type = block_type
+        self.detect = detect
+        self.render = render
+
+    def __repr__(self):
+        return f"BlockHandler({self.block_type})"
+
+# First character of a block -> the handlers that may claim it, tried in order. A block
+# is only checked against the handlers for its first character, so registering more
+# block kinds doesn't slow down classification of the others.
+BLOCK_HANDLERS = {}
+
+def register_block_handler(first_chars, handler, before=False):
+    """Register handler for blocks starting with any of first_chars.
+
+    With before=True it is tried ahead of the handlers already registered for them.
+    """
+    for char in first_chars:
+        handlers = BLOCK_HANDLERS.setdefault(char, [])
+        handlers.insert(0 if before else len(handlers), handler)
+    return handler
+
+def unregister_block_handler(handler):
+    for char in list(BLOCK_HANDLERS):
+        BLOCK_HANDLERS[char] = [h for h in BLOCK_HANDLERS[char] if h is not handler]
+        if not BLOCK_HANDLERS[char]:
+            del BLOCK_HANDLERS[char]
+
+def block_handler(markdown_block):
+    for handler in BLOCK_HANDLERS.get(markdown_block[:1], ()):
+        if handler.detect(markdown_block):
+            return handler
+    return PARAGRAPH_HANDLER
+
 def block_to_block_type(markdown_block):
-    if markdown_block.startswith("#"):
-        count = 0
-        for char in markdown_block:
-            if char == "#":
-                count += 1
-            else:
-                break
-        if 1 <= count <= 6 and markdown_block[count] == " ":
-            return BlockType.HEADING
-    if markdown_block.startswith("```") and markdown_block.endswith("```"):
-        return BlockType.CODE
-    lines = markdown_block.split("\n")
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
-    if all(line.startswith(f"{i+1}. ") for i, line in enumerate(lines)):
-        return BlockType.ORDERED_LIST
-    return BlockType.PARAGRAPH
-
-def markdown_to_html_node(markdown):
+    return block_handler(markdown_block).block_type
+
+def block_to_html_node(block, textnodes=None):
+    return block_handler(block).render(block, textnodes)
+
+def is_heading(markdown_block):
+    count = 0
+    for char in markdown_block:
+        if char == "#":
+            count += 1
+        else:
+            break
+    return 1 <= count <= 6 and markdown_block[count:count + 1] == " "
+
+def is_code(markdown_block):
+    return markdown_block.startswith("```") and markdown_block.endswith("```")
+
+def is_quote(markdown_block):
+    return all(line.startswith(">") for line in markdown_block.split("\n"))
+
+def is_unordered_list(markdown_block):
+    return all(line.startswith("- ") for line in markdown_block.split("\n"))
+
+def is_ordered_list(markdown_block):
+    return all(line.startswith(f"{i+1}. ") for i, line in enumerate(markdown_block.split("\n")))
+
+def heading_to_html_node(block, textnodes=None):
+    heading_line = block.strip().split('\n')[0]
+    i = 0
+    while i < len(heading_line) and heading_line[i] == "#":
+        i += 1
+    tag = HEADING_TAGS[min(max(i, 1), 6) - 1]
+    value = heading_line[i:].strip()
+    children = text_to_children(value, textnodes)
+    parent_node = ParentNode(tag, children)
+    return parent_node
+
+def quote_to_html_node(block, textnodes=None):
+    tag = "blockquote"
+    lines = block.split("\n")
+    new_lines = []
+    for line in lines:
+        if line.startswith(">"):
+            new_line = line[1:].strip()
+        else:
+            new_line = line.strip()
+        if new_line:
+            new_lines.append(new_line)
+    value = " ".join(new_lines)
+    children = text_to_children(value, textnodes)
+    parent_node = ParentNode(tag, children)
+    return parent_node
+
+def paragraph_to_html_node(block, textnodes=None):
+    tag = "p"
+    lines = block.strip().splitlines()
+    clean_lines = []
+    for line in lines:
+        clean_line = line.strip()
+        if clean_line:
+            clean_lines.append(clean_line)
+    value = " ".join(clean_lines)
+    children = text_to_children(value, textnodes)
+    parent_node = ParentNode(tag, children)
+    return parent_node
+
+INFO_STRING_PATTERN = re.compile(r"[\w+#.-]+")
+
+def split_info_string(block):
+    """(language, code) of a fenced block; language is None without an info string."""
+    clean_block = block.strip().removeprefix("```").removesuffix("```")
+    first_line, newline, rest = clean_block.partition("\n")
+    if newline and INFO_STRING_PATTERN.fullmatch(first_line.strip()):
+        return first_line.strip().lower(), rest.strip("\n")
+    return None, clean_block.strip("\n")
+
+def code_to_html_node(block, textnodes=None):
+    language, clean_block = split_info_string(block)
+    value = textwrap.dedent(clean_block)
+    text_node = TextNode(value, TextType.CODE)
+    if textnodes is not None:
+        textnodes.append(text_node)
+    if language is not None:
+        # Highlighted markup is already escaped, so it goes into the leaf as is.
+        html_node = LeafNode("code", highlight.highlight(value, language), {"class": f"language-{language}"})
+        return ParentNode("pre", [html_node])
+    html_node = text_node_to_html_node(text_node)
+    parent_node = ParentNode("pre", [html_node])
+    return parent_node
+
+def unordered_list_to_html_node(block, textnodes=None):
+    tag = "ul"
+    list_items_html_nodes = []
+    lines = block.strip().splitlines()
+    for line in lines:
+        line = line.lstrip()
+        if line.startswith("-") or line.startswith("*"):
+            value = line[1:].lstrip()
+        else:
+            value = line
+        children = text_to_children(value, textnodes)
+        html_node = ParentNode("li", children)
+        list_items_html_nodes.append(html_node)
+    parent_node = ParentNode(tag, list_items_html_nodes)
+    return parent_node
+
+def ordered_list_to_html_node(block, textnodes=None):
+    tag = "ol"
+    list_items_html_nodes = []
+    lines = block.strip().splitlines()
+    for line in lines:
+        line = line.lstrip()
+        idx = line.find('.')
+        if idx != -1:
+            value = line[idx + 1:].lstrip()
+        else:
+            value = line
+        children_li = text_to_children(value, textnodes)
+        html_node = ParentNode("li", children_li)
+        list_items_html_nodes.append(html_node)
+    parent_node = ParentNode(tag, list_items_html_nodes)
+    return parent_node
+
+# The built-in block kinds; anything no handler claims is a paragraph.
+PARAGRAPH_HANDLER = BlockHandler(BlockType.PARAGRAPH, lambda block: True, paragraph_to_html_node)
+register_block_handler("#", BlockHandler(BlockType.HEADING, is_heading, heading_to_html_node))
+register_block_handler("`", BlockHandler(BlockType.CODE, is_code, code_to_html_node))
+register_block_handler(">", BlockHandler(BlockType.QUOTE, is_quote, quote_to_html_node))
+register_block_handler("-", BlockHandler(BlockType.UNORDERED_LIST, is_unordered_list, unordered_list_to_html_node))
+register_block_handler("1", BlockHandler(BlockType.ORDERED_LIST, is_ordered_list, ordered_list_to_html_node))
+
+LISTING_PATTERN = re.compile(r"\{\{ pages (\S+) \}\}")
+
+def listed_pages(directory):
+    """Pages a listing of directory shows: its x.md files and x/index.md subpages, by name."""
+    pages = []
+    if not os.path.isdir(directory):
+        # A section that does not exist (yet) lists nothing.
+        return pages
+    for entry in sorted(os.listdir(directory)):
+        full_path = os.path.join(directory, entry)
+        if os.path.isdir(full_path):
+            if os.path.isfile(os.path.join(full_path, "index.md")):
+                pages.append(os.path.join(full_path, "index.md"))
+        elif entry.endswith(".md") and entry != "index.md":
+            pages.append(full_path)
+    return pages
+
+def listing_dir(from_path):
+    # The directory whose listing a page appears in (see listed_pages).
+    if os.path.basename(from_path) == "index.md":
+        return os.path.dirname(os.path.dirname(from_path))
+    return os.path.dirname(from_path)
+
+_metadata_cache = {}
+
+def page_metadata(from_path):
+    """What other pages may read from a page: its front matter and title, from the head of the file."""
+    # Listings read the same pages over and over; reuse the scan while the file is unchanged.
+    stat = os.stat(from_path)
+    key = os.path.abspath(from_path)
+    cached = _metadata_cache.get(key)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return dict(cached[1])
+    with open(from_path, 'r', encoding='utf-8') as f:
+        try:
+            metadata = scan_metadata(f)
+        except Exception:
+            metadata = {}
+    _metadata_cache[key] = ((stat.st_mtime_ns, stat.st_size), metadata)
+    return dict(metadata)
+
+# Listing directories read by each page rendered in this process, until the dependency
+# graph takes them (see listings_read), so the source need not be scanned again.
+_listings_read = {}
+
+def note_listings_read(from_path, directories):
+    _listings_read[os.path.normpath(from_path)] = directories
+
+def listings_read(from_path):
+    """The listing directories the last render of from_path read, or None if it has not
+    been rendered since they were last taken."""
+    return _listings_read.pop(os.path.normpath(from_path), None)
+
+def listing_directories(lines, page_path):
+    directories = []
+    for line in lines:
+        match = LISTING_PATTERN.fullmatch(line.strip())
+        if match:
+            directories.append(os.path.normpath(os.path.join(os.path.dirname(page_path), match.group(1))))
+    return directories
+
+def listing_to_html_node(directory, page_path, textnodes=None):
+    page_dir = os.path.dirname(page_path)
+    items = []
+    for listed_path in listed_pages(directory):
+        if os.path.basename(listed_path) == "index.md":
+            href = os.path.relpath(os.path.dirname(listed_path), page_dir) + "/"
+        else:
+            href = os.path.relpath(listed_path[:-len(".md")] + ".html", page_dir)
+        title = page_metadata(listed_path).get("title", os.path.basename(listed_path))
+        text_node = TextNode(title, TextType.LINK, href.replace(os.sep, "/"))
+        if textnodes is not None:
+            textnodes.append(text_node)
+        items.append(ParentNode("li", [text_node_to_html_node(text_node)]))
+    if not items:
+        # An empty <ul> is not valid HTML (and ParentNode refuses it), so the listing is left out.
+        return LeafNode(None, "")
+    return ParentNode("ul", items)
+
+def render_block(block, cache=None, textnodes=None, page_path=None, basepath="/"):
+    return render_block_variants(block, (basepath,), cache, textnodes, page_path)[0]
+
+def render_block_variants(block, basepaths, cache=None, textnodes=None, page_path=None):
+    """Return the block's node for each basepath. The block is parsed at most once; URLs
+    are rewritten on the node tree, and cached HTML is kept per basepath."""
+    if page_path is not None:
+        # "{{ pages DIR }}" lists the pages under DIR (relative to this page); it reads
+        # other files, so it is never served from the block cache.
+        match = LISTING_PATTERN.fullmatch(block.strip())
+        if match:
+            directory = os.path.normpath(os.path.join(os.path.dirname(page_path), match.group(1)))
+            _listings_read.setdefault(os.path.normpath(page_path), []).append(directory)
+            node = listing_to_html_node(directory, page_path, textnodes)
+            return [rewrite_urls(node, basepath) for basepath in basepaths]
+    if cache is None:
+        node = block_to_html_node(block, textnodes)
+        return [rewrite_urls(node, basepath) for basepath in basepaths]
+    node = None
+    block_textnodes = None
+    nodes = []
+    for basepath in basepaths:
+        entry = cache.get(block, basepath)
+        if entry is None:
+            if node is None:
+                block_textnodes = []
+                node = block_to_html_node(block, block_textnodes)
+            html = rewrite_urls(node, basepath).to_html()
+            cache.put(block, html, block_textnodes, basepath)
+        else:
+            html, entry_textnodes = entry
+            if block_textnodes is None:
+                block_textnodes = entry_textnodes
+        nodes.append(LeafNode(None, html))
+    if textnodes is not None:
+        textnodes.extend(block_textnodes)
+    return nodes
+
+def markdown_to_html_node(markdown, cache=None, textnodes=None, page_path=None, basepath="/"):
     block_nodes = []
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        if block_type == BlockType.HEADING:
-            heading_line = block.strip().split('\n')[0]
-            i = 0
-            while i < len(heading_line) and heading_line[i] == "#":
-                i += 1
-            if 1 <= i <= 6:
-                tag = f"h{i}" 
-            else:
-                tag = "h6"
-            value = heading_line[i:].strip()
-            children = text_to_children(value)
-            parent_node = ParentNode(tag, children)
-            block_nodes.append(parent_node)
-
-        if block_type == BlockType.QUOTE:
-            tag = "blockquote"
-            lines = block.split("\n")
-            new_lines = []
-            for line in lines:
-                if line.startswith(">"):
-                    new_line = line[1:].strip()
-                else:
-                    new_line = line.strip()
-                if new_line:
-                    new_lines.append(new_line)
-            value = " ".join(new_lines)
-            children = text_to_children(value)
-            parent_node = ParentNode(tag, children)
-            block_nodes.append(parent_node)
-
-        if block_type == BlockType.PARAGRAPH:
-            tag = "p"
-            lines = block.strip().splitlines()
-            clean_lines = []
-            for line in lines:
-                clean_line = line.strip()
-                if clean_line:
-                    clean_lines.append(clean_line)
-            value = " ".join(clean_lines)
-            children = text_to_children(value)
-            parent_node = ParentNode(tag, children)
-            block_nodes.append(parent_node)
-
-        if block_type == BlockType.CODE:
-            tag = "code"
-            clean_block = block.strip().removeprefix("```").removesuffix("```").strip("\n")
-            value = textwrap.dedent(clean_block)
-            text_node = TextNode(value, TextType.CODE)
-            html_node = text_node_to_html_node(text_node)
-            parent_node = ParentNode("pre", [html_node])
-            block_nodes.append(parent_node)
-
-        if block_type == BlockType.UNORDERED_LIST:
-            tag = "ul"
-            list_items_html_nodes = []
-            lines = block.strip().splitlines()
-            for line in lines:
-                line = line.lstrip()
-                if line.startswith("-") or line.startswith("*"):
-                    value = line[1:].lstrip()
-                else:
-                    value = line
-                children = text_to_children(value)
-                html_node = ParentNode("li", children)
-                list_items_html_nodes.append(html_node)
-            parent_node = ParentNode(tag, list_items_html_nodes)
-            block_nodes.append(parent_node)
-
-        elif block_type == BlockType.ORDERED_LIST:
-            tag = "ol"
-            list_items_html_nodes = []
-            lines = block.strip().splitlines()
-            for line in lines:
-                line = line.lstrip()
-                idx = line.find('.')
-                if idx != -1:
-                    value = line[idx + 1:].lstrip()
-                else:
-                    value = line
-                children_li = text_to_children(value)
-                html_node = ParentNode("li", children_li)
-                list_items_html_nodes.append(html_node)
-            parent_node = ParentNode(tag, list_items_html_nodes)
-            block_nodes.append(parent_node)
+    for block in iter_blocks(markdown.split("\n")):
+        block_nodes.append(render_block(block, cache, textnodes, page_path, basepath))
     html = ParentNode("div", block_nodes)
     return html
 
+def stream_markdown_html(lines, stream, cache=None, textnodes=None, page_path=None, basepath="/"):
+    """Render markdown lines block by block into stream, as markdown_to_html_node(...).render_to would."""
+    stream.write("<div>")
+    for block in iter_blocks(lines):
+        render_block(block, cache, textnodes, page_path, basepath).render_to(stream)
+    stream.write("</div>")
+
+def markdown_variants(lines, basepaths, cache=None, textnodes=None, page_path=None):
+    """Render markdown lines once into one list of block nodes per basepath."""
+    variants = [[] for _ in basepaths]
+    for block in iter_blocks(lines):
+        for nodes, node in zip(variants, render_block_variants(block, basepaths, cache, textnodes, page_path)):
+            nodes.append(node)
+    return variants
+
 
-    
-    
-def text_to_children(text):
+def text_to_children(text, textnodes=None):
     text_nodes = text_to_textnodes(text)
+    if textnodes is not None:
+        textnodes.extend(text_nodes)
     html_nodes = []
     for text_node in text_nodes:
         html_node = text_node_to_html_node(text_node)
@@ -268,47 +529,305 @@ def text_to_children(text):
     return html_nodes
 
 
-def copy_static(source_dir: str, destination_dir: str):
-    if os.path.exists(destination_dir):
+def copy_static(source_dir: str, destination_dir: str, clean=True):
+    if clean and os.path.islink(destination_dir):
+        # Left by an --atomic build; the published build it points to is not touched.
+        os.remove(destination_dir)
+    elif clean and os.path.exists(destination_dir):
         shutil.rmtree(destination_dir)
-    os.makedirs(destination_dir)
+    os.makedirs(destination_dir, exist_ok=True)
     shutil.copytree(source_dir, destination_dir, dirs_exist_ok=True)
 
 def extract_title(markdown):
-    lines = markdown.split("\n")
+    return scan_metadata(markdown.split("\n"))["title"]
+
+def scan_title(lines):
+    # Stops at the first H1, so for a file only the lines up to the title are read.
     for line in lines:
         if line.startswith("# "):
             return line[2:].strip()
     raise Exception("H1 header doesn't exsist in this file")
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+# Front matter opens and closes with "---" (YAML style, key: value) or "+++" (TOML style, key = value).
+FRONT_MATTER_SEPARATORS = {"---": ":", "+++": "="}
+
+def parse_front_matter_value(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [parse_front_matter_value(item) for item in text[1:-1].split(",") if item.strip()]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+def scan_front_matter(lines):
+    """Read front matter from the start of lines; returns {} if there is none.
+
+    Only the front matter lines are consumed, so lines can be a file that is read further.
+    """
+    lines = iter(lines)
+    first = next(lines, "").strip()
+    separator = FRONT_MATTER_SEPARATORS.get(first)
+    if separator is None:
+        return {}
+    metadata = {}
+    for line in lines:
+        line = line.strip()
+        if line == first:
+            return metadata
+        if not line or line.startswith("#"):
+            continue
+        key, found, value = line.partition(separator)
+        if not found:
+            raise Exception(f"invalid front matter line: {line}")
+        metadata[key.strip().lower()] = parse_front_matter_value(value)
+    raise Exception("front matter is not closed")
+
+def scan_metadata(lines):
+    """Front matter plus the title, reading only the head of the page.
+
+    The title comes from the front matter if it sets one, else from the first H1.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {"title": scan_title(())}
+    if first.strip() not in FRONT_MATTER_SEPARATORS:
+        return {"title": scan_title(itertools.chain([first], lines))}
+    metadata = scan_front_matter(itertools.chain([first], lines))
+    if "title" not in metadata:
+        metadata["title"] = scan_title(lines)
+    return metadata
+
+def skip_front_matter(lines):
+    """Yield the lines after the front matter (all lines if there is none)."""
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    if first.strip() in FRONT_MATTER_SEPARATORS:
+        for line in lines:
+            if line.strip() == first.strip():
+                break
+    else:
+        yield first
+    yield from lines
+
+def template_values(metadata):
+    # Every front matter key is available to the template as {{ Key }}.
+    values = {}
+    for key, value in metadata.items():
+        values[key.capitalize()] = ", ".join(value) if isinstance(value, list) else str(value)
+    return values
+
+class LinkIndex:
+    """Links and images of every rendered page, taken from the TextNodes the parser produced."""
+
+    def __init__(self):
+        self.pages = {}
+
+    @staticmethod
+    def page_links(textnodes):
+        return [
+            (node.text_type.value, node.url, node.text)
+            for node in textnodes
+            if node.text_type is TextType.LINK or node.text_type is TextType.IMAGE
+        ]
+
+    @classmethod
+    def page_summary(cls, textnodes):
+        # What a page contributes to the index; computed where the page was rendered
+        # (possibly a worker process) and handed to add_summary.
+        return cls.page_links(textnodes)
+
+    def add_summary(self, page, summary):
+        self.pages[page] = summary
+
+    def add_page(self, page, textnodes):
+        self.add_summary(page, self.page_summary(textnodes))
+
+    # Incremental builds keep each page's contribution in the manifest entry.
+    def has_entry(self, entry):
+        return "links" in entry
+
+    def to_entry(self, page, entry):
+        entry["links"] = self.pages[page]
+
+    def from_entry(self, page, entry):
+        self.pages[page] = [tuple(link) for link in entry["links"]]
+
+    def links(self):
+        for page, links in self.pages.items():
+            for text_type, url, text in links:
+                yield page, text_type, url, text
+
+    def pages_linking_to(self, url):
+        return sorted({page for page, _, target, _ in self.links() if target == url})
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.pages, f, indent=1, sort_keys=True)
+
+    def __repr__(self):
+        return f"LinkIndex(pages = {len(self.pages)})"
+
+def page_log_line(from_path, template_path, dest_path):
+    return f"Generating page from {from_path} to {dest_path} using {template_path}"
+
+def generate_page(from_path, template_path, dest_path, basepath, cache=None, link_index=None):
+    print(page_log_line(from_path, template_path, dest_path))
+    textnodes = [] if link_index is not None else None
+    render_page_file(from_path, template_path, dest_path, basepath, cache, textnodes)
+    if link_index is not None:
+        link_index.add_page(from_path, textnodes)
+
+def render_page(markdown, template, basepath, cache=None, textnodes=None, page_path=None):
+    """Render a whole page to a string; same output as render_page_file for in-memory markdown."""
+    buffer = io.StringIO()
+    if page_path is not None:
+        note_listings_read(page_path, [])
+    values = template_values(scan_metadata(markdown.split("\n")))
+    def write_content(stream):
+        stream_markdown_html(skip_front_matter(markdown.split("\n")), stream, cache, textnodes, page_path, basepath)
+    template.render_to(buffer, values, write_content)
+    return buffer.getvalue()
+
+def render_page_file(from_path, template_path, dest_path, basepath, cache=None, textnodes=None):
+    # The markdown is never held in memory as a whole: the metadata comes from a scan of
+    # the head of the file, then blocks are read, rendered and written one at a time.
+    note_listings_read(from_path, [])
+    with open(from_path, 'r', encoding='utf-8') as f:
+        values = template_values(scan_metadata(f))
+    template = load_template(template_path, basepath)
+    def write_content(stream):
+        with open(from_path, 'r', encoding='utf-8') as f:
+            stream_markdown_html(skip_front_matter(f), stream, cache, textnodes, from_path, basepath)
+    write_page(dest_path, template, values, write_content)
+
+def write_page(dest_path, template, values, write_content):
+    with open_atomic(dest_path) as f:
+        template.render_to(f, values, write_content)
+
+def render_page_variants(from_path, template_path, targets, cache=None, textnodes=None):
+    """Render one markdown file into several outputs; targets is [(basepath, dest_path)].
+
+    The file is read and parsed once; each output gets its own copy of the node
+    tree with URLs rewritten for its basepath.
+    """
+    note_listings_read(from_path, [])
+    with open(from_path, 'r', encoding='utf-8') as f:
+        values = template_values(scan_metadata(f))
     with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
-    html_content = markdown_to_html_node(markdown_content).to_html()
-    title = extract_title(markdown_content)
-    html_page = template_content.replace("{{ Title }}", title)
-    html_page = html_page.replace("{{ Content }}", html_content)
-    html_page = html_page.replace('href="/', f'href="{basepath}')
-    html_page = html_page.replace('src="/', f'src="{basepath}')
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(html_page)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
+        variants = markdown_variants(skip_front_matter(f), [basepath for basepath, _ in targets], cache, textnodes, from_path)
+    for (basepath, dest_path), nodes in zip(targets, variants):
+        def write_content(stream, nodes=nodes):
+            stream.write("<div>")
+            for node in nodes:
+                node.render_to(stream)
+            stream.write("</div>")
+        write_page(dest_path, load_template(template_path, basepath), values, write_content)
+
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
     def recurse(current_path, current_dest_path):
-        for entry in os.listdir(current_path):
+        for entry in sorted(os.listdir(current_path)):
             full_path = os.path.join(current_path, entry)
             dst_path = os.path.join(current_dest_path, entry.replace('.md', '.html') if entry.endswith('.md') else entry)
             if os.path.isfile(full_path):
                 if entry.endswith('.md'):
-                    os.makedirs(current_dest_path, exist_ok=True)
-                    generate_page(full_path, template_path, dst_path, basepath)
-                
+                    pages.append((full_path, dst_path))
             else:
-                os.makedirs(dst_path, exist_ok=True)
                 recurse(full_path, dst_path)
 
-    recurse(dir_path_content, dest_dir_path)
\ No newline at end of file
+    recurse(dir_path_content, dest_dir_path)
+    return pages
+
+_worker_cache = None
+
+def _init_worker(cache, image_attributes=None, highlight_cache_dir=None):
+    global _worker_cache
+    _worker_cache = cache
+    # Worker processes may not have inherited the parent's settings (spawn start method).
+    if image_attributes is not None:
+        set_image_attributes(image_attributes)
+    highlight.CACHE_DIR = highlight_cache_dir
+
+def _render_job(job):
+    render, render_args, index_type = job
+    error = None
+    textnodes = [] if index_type is not None else None
+    try:
+        render(*render_args, _worker_cache, textnodes)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    # New cache entries, the page's index summary and the listings it read travel back to the parent.
+    cache_delta = _worker_cache.drain() if _worker_cache is not None else None
+    summary = index_type.page_summary(textnodes) if index_type is not None and error is None else None
+    return error, cache_delta, summary, listings_read(render_args[0])
+
+def render_in_pool(render, work, template_path, jobs, cache=None, link_index=None):
+    """Call render(*args, cache, textnodes) in jobs worker processes for every
+    (source, args, dest_paths) in work, merging cache entries and index summaries back."""
+    index_type = type(link_index) if link_index is not None else None
+    tasks = [(render, render_args, index_type) for _, render_args, _ in work]
+    chunksize = max(1, len(tasks) // (jobs * 8))
+    failures = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache, IMAGE_ATTRIBUTES, highlight.CACHE_DIR)) as executor:
+        # map() yields in submission order, so the log reads exactly like a serial build.
+        for (from_path, _, dest_paths), (error, cache_delta, summary, listings) in zip(work, executor.map(_render_job, tasks, chunksize=chunksize)):
+            for dest_path in dest_paths:
+                print(page_log_line(from_path, template_path, dest_path))
+            if cache_delta is not None:
+                cache.merge(cache_delta)
+            if summary is not None:
+                link_index.add_summary(from_path, summary)
+            if listings is not None:
+                note_listings_read(from_path, listings)
+            if error is not None:
+                print(f"  failed: {from_path}: {error}")
+                failures.append(from_path)
+    if failures:
+        raise Exception(f"{len(failures)} page(s) failed to generate: {', '.join(failures)}")
+
+def generate_pages(pages, template_path, basepath, jobs=1, cache=None, link_index=None, artifacts=None):
+    if artifacts is not None:
+        # Pages found in the artifact cache are copied out; only the rest are rendered.
+        missing = artifacts.restore(pages, template_path, basepath, link_index)
+        generate_pages(missing, template_path, basepath, jobs, cache, link_index)
+        artifacts.store(missing, template_path, basepath, link_index)
+        return
+    if jobs is not None and jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs is None or jobs == 1 or len(pages) < 2:
+        for from_path, dest_path in pages:
+            generate_page(from_path, template_path, dest_path, basepath, cache, link_index)
+        return
+    work = [(from_path, (from_path, template_path, dest_path, basepath), [dest_path]) for from_path, dest_path in pages]
+    render_in_pool(render_page_file, work, template_path, jobs, cache, link_index)
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, jobs=1, cache=None, link_index=None, artifacts=None):
+    generate_pages(collect_pages(dir_path_content, dest_dir_path), template_path, basepath, jobs, cache, link_index, artifacts)
+
+def collect_page_variants(dir_path_content, variants):
+    """[(source, [(basepath, dest_path), ...])] for variants given as [(basepath, dest_dir_path)]."""
+    collected = [collect_pages(dir_path_content, dest_dir_path) for _, dest_dir_path in variants]
+    return [(pages[0][0], [(basepath, dest_path) for (basepath, _), (_, dest_path) in zip(variants, pages)])
+            for pages in zip(*collected)]
+
+def generate_page_variants(pages, template_path, jobs=1, cache=None, link_index=None):
+    """Like generate_pages, for pages from collect_page_variants: one parse per source, one output per variant."""
+    if jobs is not None and jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs is None or jobs == 1 or len(pages) < 2:
+        for from_path, targets in pages:
+            for _, dest_path in targets:
+                print(page_log_line(from_path, template_path, dest_path))
+            textnodes = [] if link_index is not None else None
+            render_page_variants(from_path, template_path, targets, cache, textnodes)
+            if link_index is not None:
+                link_index.add_page(from_path, textnodes)
+        return
+    work = [(from_path, (from_path, template_path, targets), [dest_path for _, dest_path in targets]) for from_path, targets in pages]
+    render_in_pool(render_page_variants, work, template_path, jobs, cache, link_index)